@@ -7,52 +7,122 @@ Automated script to debug window creation issues without user intervention.
 """
 
 import sys
-import os
 import time
-import subprocess
-import logging
 
-# Add the package to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'x11_gstreamer_viewer'))
+# Buffered progress output, written out at phase boundaries
+_OUTPUT = []
 
-def run_command(cmd, timeout=10):
-    """Run a command with timeout."""
+def emit(line):
+    """Queue a line of progress output."""
+    _OUTPUT.append(line)
+
+def flush_output():
+    """Write queued progress output in a single call."""
+    if _OUTPUT:
+        sys.stdout.write("\n".join(_OUTPUT) + "\n")
+        _OUTPUT.clear()
+    sys.stdout.flush()
+
+# Shared display connection for environment queries (opened on first use)
+_DISPLAY = None
+
+def _get_display():
+    """Get the shared X11 display connection."""
+    global _DISPLAY
+    if _DISPLAY is None:
+        from Xlib import display
+        _DISPLAY = display.Display()
+    return _DISPLAY
+
+def _walk_tree(window, tree):
+    """Recursively collect window geometry into tree."""
+    from Xlib.error import BadWindow, BadDrawable
+    
+    for child in window.query_tree().children:
+        try:
+            geom = child.get_geometry()
+            tree[child.id] = (geom.x, geom.y, geom.width, geom.height)
+            _walk_tree(child, tree)
+        except (BadWindow, BadDrawable):
+            # Window went away during the walk
+            continue
+
+def get_window_tree():
+    """Get the root window tree as {window_id: (x, y, width, height)}."""
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, 
-                              text=True, timeout=timeout)
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "", "Command timed out"
+        tree = {}
+        _walk_tree(_get_display().screen().root, tree)
     except Exception as e:
-        return False, "", str(e)
+        return False, str(e)
+    return True, tree
+
+def get_wm_name():
+    """Get the running window manager name via _NET_SUPPORTING_WM_CHECK."""
+    from Xlib import X
+    
+    dpy = _get_display()
+    root = dpy.screen().root
+    check = root.get_full_property(dpy.intern_atom('_NET_SUPPORTING_WM_CHECK'),
+                                   X.AnyPropertyType)
+    if check is None or not check.value:
+        return None
+    
+    wm_window = dpy.create_resource_object('window', check.value[0])
+    name = wm_window.get_full_property(dpy.intern_atom('_NET_WM_NAME'),
+                                       X.AnyPropertyType)
+    if name is None:
+        return ""
+    value = name.value
+    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
 
 def get_window_info():
     """Get comprehensive window information."""
-    print("🔍 Analyzing Window Environment...")
+    emit("🔍 Analyzing Window Environment...")
     
     # Check window manager
-    success, stdout, stderr = run_command("pgrep i3")
-    if success and stdout.strip():
-        print("   ✓ i3 window manager detected")
+    try:
+        wm_name = get_wm_name()
+    except Exception as e:
+        emit(f"   ⚠ Could not query window manager: {e}")
+        wm_name = None
+    
+    if wm_name is not None and wm_name.lower() == "i3":
+        emit("   ✓ i3 window manager detected")
         wm = "i3"
     else:
-        print("   ⚠ i3 not detected, checking other WMs...")
-        success, stdout, stderr = run_command("pgrep -f 'window.*manager'")
-        if success and stdout.strip():
-            print("   ✓ Other window manager detected")
+        emit("   ⚠ i3 not detected, checking other WMs...")
+        if wm_name is not None:
+            emit(f"   ✓ Other window manager detected: {wm_name or 'unnamed'}")
             wm = "other"
         else:
-            print("   ⚠ No window manager detected")
+            emit("   ⚠ No window manager detected")
             wm = "none"
     
     # Get window tree
-    success, stdout, stderr = run_command("xwininfo -tree -root")
+    success, tree = get_window_tree()
     if success:
-        print("   ✓ Window tree retrieved")
-        return wm, stdout
+        emit(f"   ✓ Window tree retrieved ({len(tree)} windows)")
+        return wm, tree
     else:
-        print(f"   ✗ Failed to get window tree: {stderr}")
-        return wm, ""
+        emit(f"   ✗ Failed to get window tree: {tree}")
+        return wm, {}
+
+def wait_for_viewable(x11_manager, timeout=0.5, interval=0.05):
+    """Wait until the manager's window is viewable, bounded by timeout seconds."""
+    from Xlib import X
+    from Xlib.error import BadWindow, BadDrawable
+    
+    x11_manager.dpy.sync()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if x11_manager.window.get_attributes().map_state == X.IsViewable:
+                return True
+        except (BadWindow, BadDrawable):
+            return False
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
 
 def analyze_window_creation():
     """Analyze window creation process."""
@@ -87,11 +157,14 @@ def analyze_window_creation():
             
             # Wait and observe
             print("   Observing window behavior...")
-            time.sleep(2)
+            if wait_for_viewable(x11_manager):
+                print("   ✓ Window mapped and viewable")
+            else:
+                print("   ⚠ Window not viewable after waiting")
             
             # Check if window is still there
-            success, stdout, stderr = run_command("xwininfo -tree -root")
-            if success and str(window_id) in stdout:
+            success, tree = get_window_tree()
+            if success and window_id in tree:
                 print("   ✓ Window still visible in window tree")
             else:
                 print("   ⚠ Window not found in window tree")
@@ -164,12 +237,15 @@ def test_gstreamer_integration():
 
 def run_comprehensive_test():
     """Run comprehensive test suite."""
-    print("🚀 Running Comprehensive Debug Test")
-    print("=" * 50)
+    emit("🚀 Running Comprehensive Debug Test")
+    emit("=" * 50)
     
     # Get initial environment info
     wm, window_tree = get_window_info()
     
+    # The window/GStreamer phases print and log directly; keep output ordered
+    flush_output()
+    
     # Test window creation
     window_test_passed = analyze_window_creation()
     
@@ -177,36 +253,38 @@ def run_comprehensive_test():
     gstreamer_test_passed = test_gstreamer_integration()
     
     # Final analysis
-    print("\n📊 Test Results Summary")
-    print("=" * 30)
-    print(f"Window Manager: {wm}")
-    print(f"Window Creation: {'PASS' if window_test_passed else 'FAIL'}")
-    print(f"GStreamer Integration: {'PASS' if gstreamer_test_passed else 'FAIL'}")
+    emit("\n📊 Test Results Summary")
+    emit("=" * 30)
+    emit(f"Window Manager: {wm}")
+    emit(f"Window Creation: {'PASS' if window_test_passed else 'FAIL'}")
+    emit(f"GStreamer Integration: {'PASS' if gstreamer_test_passed else 'FAIL'}")
     
     if window_test_passed and gstreamer_test_passed:
-        print("\n🎉 All tests passed! The window fix is working correctly.")
-        print("   The double window issue should be resolved.")
+        emit("\n🎉 All tests passed! The window fix is working correctly.")
+        emit("   The double window issue should be resolved.")
         return True
     else:
-        print("\n❌ Some tests failed. Issues still exist.")
+        emit("\n❌ Some tests failed. Issues still exist.")
         if not window_test_passed:
-            print("   - Window creation issues detected")
+            emit("   - Window creation issues detected")
         if not gstreamer_test_passed:
-            print("   - GStreamer integration issues detected")
+            emit("   - GStreamer integration issues detected")
         return False
 
 def main():
     """Main function."""
-    print("Automated Window Debug Tool")
-    print("Created by Ruliano Castian - From the streets to the code!")
-    print()
+    emit("Automated Window Debug Tool")
+    emit("Created by Ruliano Castian - From the streets to the code!")
+    emit("")
     
     try:
         success = run_comprehensive_test()
         return 0 if success else 1
     except Exception as e:
-        print(f"Fatal error: {e}")
+        emit(f"Fatal error: {e}")
         return 1
+    finally:
+        flush_output()
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
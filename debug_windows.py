@@ -6,46 +6,86 @@ Created by Ruliano Castian - From the streets to the code!
 Debug script to analyze window creation issues in i3 window manager.
 """
 
-import sys
 import os
 import time
-import subprocess
 import logging
 
-# Add the package to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'x11_gstreamer_viewer'))
+# Shared display connection for window tree queries (opened on first use)
+_DISPLAY = None
 
-from Xlib import display, X
-from x11_gstreamer_viewer.core.x11_manager import X11WindowManager
-from x11_gstreamer_viewer.utils.logger import setup_logging
+# Window manager info, looked up once per run
+_WM_INFO = None
+
+def _get_display():
+    """Get the shared X11 display connection."""
+    global _DISPLAY
+    if _DISPLAY is None:
+        from Xlib import display
+        _DISPLAY = display.Display()
+    return _DISPLAY
+
+def _format_tree(window, depth, lines):
+    """Append an xwininfo-style line for each child of window, recursively."""
+    from Xlib.error import XError
+    
+    for child in window.query_tree().children:
+        try:
+            geom = child.get_geometry()
+            name = child.get_wm_name()
+            wm_class = child.get_wm_class()
+        except XError:
+            # Window went away during the walk
+            continue
+        
+        label = f'"{name}"' if name else "(has no name)"
+        if wm_class:
+            label += f': ("{wm_class[0]}" "{wm_class[1]}")'
+        lines.append(f"{'   ' * depth}0x{child.id:x} {label}  "
+                     f"{geom.width}x{geom.height}+{geom.x}+{geom.y}")
+        _format_tree(child, depth + 1, lines)
 
 def get_window_info():
     """Get information about all windows."""
     try:
-        # Get window tree
-        result = subprocess.run(['xwininfo', '-tree', '-root'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            return result.stdout
-        else:
-            return f"Error getting window tree: {result.stderr}"
+        root = _get_display().screen().root
+        lines = [f"Root window id: 0x{root.id:x} (the root window)"]
+        _format_tree(root, 1, lines)
+        return "\n".join(lines)
     except Exception as e:
         return f"Exception getting window info: {e}"
 
 def get_window_manager_info():
     """Get window manager information."""
+    global _WM_INFO
+    if _WM_INFO is not None:
+        return _WM_INFO
+    
     try:
-        # Check if i3 is running
-        result = subprocess.run(['pgrep', 'i3'], capture_output=True, text=True)
-        if result.returncode == 0:
-            return "i3 window manager detected"
-        else:
-            return "i3 not detected"
+        # Check if i3 is running by scanning /proc/<pid>/comm
+        found = False
+        with os.scandir('/proc') as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(os.path.join(entry.path, 'comm')) as f:
+                        if f.read().strip() == 'i3':
+                            found = True
+                            break
+                except OSError:
+                    continue
+        
+        _WM_INFO = "i3 window manager detected" if found else "i3 not detected"
+        return _WM_INFO
     except Exception as e:
         return f"Exception checking window manager: {e}"
 
 def analyze_window_creation():
     """Analyze window creation process."""
+    from Xlib import X
+    from x11_gstreamer_viewer.core.x11_manager import X11WindowManager
+    from x11_gstreamer_viewer.utils.logger import setup_logging
+    
     print("Window Debug Analysis")
     print("=" * 50)
     
@@ -64,8 +104,8 @@ def analyze_window_creation():
     
     print("3. Creating test window...")
     try:
-        # Create X11 manager
-        x11_manager = X11WindowManager()
+        # Create X11 manager on the shared display connection
+        x11_manager = X11WindowManager(dpy=_get_display())
         
         # Create a small test window
         if x11_manager.create_window(width=400, height=300, title="Debug Test Window"):
@@ -84,7 +124,7 @@ def analyze_window_creation():
             print("5. Window Properties Analysis:")
             try:
                 # Get detailed window info
-                dpy = display.Display()
+                dpy = _get_display()
                 window = dpy.create_resource_object('window', window_id)
                 
                 # Get window attributes
@@ -124,6 +164,8 @@ def analyze_window_creation():
 
 def test_multiple_windows():
     """Test creating multiple windows to see if duplicates occur."""
+    from x11_gstreamer_viewer.core.x11_manager import X11WindowManager
+    
     print("\nMultiple Window Test")
     print("=" * 30)
     
@@ -132,7 +174,7 @@ def test_multiple_windows():
         
         for i in range(3):
             print(f"Creating window {i+1}...")
-            x11_manager = X11WindowManager()
+            x11_manager = X11WindowManager(dpy=_get_display())
             
             if x11_manager.create_window(
                 width=300, height=200, 
@@ -7,13 +7,8 @@ A simple demo script that shows the X11 GStreamer Viewer in action.
 """
 
 import sys
-import os
 import logging
 
-# Add the package to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'x11_gstreamer_viewer'))
-
-from x11_gstreamer_viewer.ui.main_window import MainWindow
 from x11_gstreamer_viewer.utils.logger import setup_logging
 
 def main():
@@ -27,7 +22,11 @@ def main():
     setup_logging(level="INFO")
     logger = logging.getLogger(__name__)
     
+    main_window = None
     try:
+        # Imported here so the window/GStreamer stack loads only when used
+        from x11_gstreamer_viewer.ui.main_window import MainWindow
+        
         # Create main window
         logger.info("Creating main window...")
         main_window = MainWindow(width=1920, height=1080)
@@ -73,10 +72,11 @@ def main():
         logger.error(f"Demo error: {e}")
         return 1
     finally:
-        try:
-            main_window.close()
-        except:
-            pass
+        if main_window is not None:
+            try:
+                main_window.close()
+            except Exception:
+                pass
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
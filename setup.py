@@ -24,6 +24,9 @@ setup(
             "black>=22.0.0",
             "flake8>=4.0.0",
         ],
+        "fast": [
+            "orjson>=3.6.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -8,51 +8,52 @@ without requiring all dependencies to be installed.
 """
 
 import sys
-import os
+import importlib
+import importlib.util
 
-# Add the package to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'x11_gstreamer_viewer'))
+# (module, attribute) pairs checked by test_imports
+_IMPORTS = [
+    ("x11_gstreamer_viewer.core.x11_manager", "X11WindowManager"),
+    ("x11_gstreamer_viewer.core.gstreamer_manager", "GStreamerManager"),
+    ("x11_gstreamer_viewer.ui.main_window", "MainWindow"),
+    ("x11_gstreamer_viewer.utils.config", "Config"),
+]
+
+# Classes loaded by test_imports, shared by the remaining tests
+_MODS = {}
 
 def test_imports():
     """Test that all modules can be imported."""
     print("Testing imports...")
     
-    try:
-        from x11_gstreamer_viewer.core.x11_manager import X11WindowManager
-        print("✓ X11WindowManager imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import X11WindowManager: {e}")
-        return False
-    
-    try:
-        from x11_gstreamer_viewer.core.gstreamer_manager import GStreamerManager
-        print("✓ GStreamerManager imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import GStreamerManager: {e}")
-        return False
-    
-    try:
-        from x11_gstreamer_viewer.ui.main_window import MainWindow
-        print("✓ MainWindow imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import MainWindow: {e}")
+    # Locate every module first (cheap, runs no module code) so a missing
+    # one is reported without importing the others
+    missing = [name for name, _ in _IMPORTS if importlib.util.find_spec(name) is None]
+    for name in missing:
+        print(f"✗ {name} not found")
+    if missing:
         return False
     
-    try:
-        from x11_gstreamer_viewer.utils.config import Config
-        print("✓ Config imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import Config: {e}")
-        return False
+    ok = True
+    for name, attr in _IMPORTS:
+        try:
+            _MODS[attr] = getattr(importlib.import_module(name), attr)
+            print(f"✓ {attr} imported successfully")
+        except (ImportError, AttributeError) as e:
+            print(f"✗ Failed to import {attr}: {e}")
+            ok = False
     
-    return True
+    return ok
 
 def test_x11_manager():
     """Test X11 manager initialization."""
     print("\nTesting X11 Manager...")
     
     try:
-        from x11_gstreamer_viewer.core.x11_manager import X11WindowManager
+        if "X11WindowManager" not in _MODS:
+            print("✗ X11WindowManager was not imported")
+            return False
+        X11WindowManager = _MODS["X11WindowManager"]
         
         # Test initialization
         x11_manager = X11WindowManager()
@@ -91,7 +92,10 @@ def test_gstreamer_manager():
     print("\nTesting GStreamer Manager...")
     
     try:
-        from x11_gstreamer_viewer.core.gstreamer_manager import GStreamerManager
+        if "GStreamerManager" not in _MODS:
+            print("✗ GStreamerManager was not imported")
+            return False
+        GStreamerManager = _MODS["GStreamerManager"]
         
         # Test initialization
         gst_manager = GStreamerManager()
@@ -123,7 +127,10 @@ def test_config():
     print("\nTesting Configuration...")
     
     try:
-        from x11_gstreamer_viewer.utils.config import Config
+        if "Config" not in _MODS:
+            print("✗ Config was not imported")
+            return False
+        Config = _MODS["Config"]
         
         # Test initialization
         config = Config()
@@ -144,8 +151,8 @@ def test_config():
         args = {
             "video_width": 1280,
             "video_height": 720,
-            "window_width": 1920,
-            "window_height": 1080,
+            "width": 1920,
+            "height": 1080,
             "title": "Test Title"
         }
         config.update_from_args(args)
@@ -171,7 +178,10 @@ def test_main_window():
     print("\nTesting Main Window...")
     
     try:
-        from x11_gstreamer_viewer.ui.main_window import MainWindow
+        if "MainWindow" not in _MODS:
+            print("✗ MainWindow was not imported")
+            return False
+        MainWindow = _MODS["MainWindow"]
         
         # Test initialization
         main_window = MainWindow(width=800, height=600)
@@ -7,30 +7,166 @@ Test script to verify the window creation fix for i3 compatibility.
 """
 
 import sys
-import os
 import time
-import subprocess
+import atexit
+import select
 
-# Add the package to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'x11_gstreamer_viewer'))
+from Xlib import X, Xatom, display
+from Xlib.error import BadWindow, BadDrawable
 
 from x11_gstreamer_viewer.core.x11_manager import X11WindowManager
 from x11_gstreamer_viewer.utils.logger import setup_logging
 
+# Substrings (lowercase bytes) that identify windows created by these tests
+_WINDOW_MARKERS = (b"x11-gstreamer-viewer", b"test")
+
+# Shared window counter (and its X connection), created on first use
+_COUNTER = None
+
+def _ignore_error(*args):
+    """Swallow asynchronous X errors for windows that disappeared."""
+
+def _window_label(window):
+    """Get the lowercased raw WM_NAME + WM_CLASS bytes of a window (no decoding)."""
+    label = b""
+    for atom in (Xatom.WM_NAME, Xatom.WM_CLASS):
+        prop = window.get_full_property(atom, X.AnyPropertyType)
+        if prop is not None and isinstance(prop.value, bytes):
+            label += prop.value + b"\0"
+    return label.lower()
+
+def _walk_windows(window):
+    """Yield (window, label) for every descendant of window."""
+    for child in window.query_tree().children:
+        try:
+            yield child, _window_label(child)
+            yield from _walk_windows(child)
+        except (BadWindow, BadDrawable):
+            # Window went away during the walk
+            continue
+
+class WindowCounter:
+    """
+    Live count of test windows, kept up to date from X events.
+    
+    The baseline comes from the window manager's _NET_CLIENT_LIST (one
+    property read), or a walk of the window tree when no EWMH window
+    manager is running; afterwards new top-level windows are
+    picked up from CreateNotify on the root, renames from PropertyNotify and
+    removals from DestroyNotify, so counting only drains pending events.
+    """
+    
+    _EVENT_MASK = X.StructureNotifyMask | X.PropertyChangeMask
+    
+    def __init__(self, markers):
+        self.markers = markers
+        self.dpy = display.Display()
+        self.root = self.dpy.screen().root
+        
+        # Window ID -> whether it matches a marker (None until its label is fetched)
+        self.windows = {}
+        
+        self.root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        clients = self.root.get_full_property(
+            self.dpy.intern_atom('_NET_CLIENT_LIST'), Xatom.WINDOW
+        )
+        if clients is not None:
+            # Labels are fetched on the first count
+            for window_id in clients.value:
+                self._track(self.dpy.create_resource_object('window', window_id))
+        else:
+            for window, label in _walk_windows(self.root):
+                if self._matches(label):
+                    self._track(window, True)
+        self.dpy.sync()
+    
+    def _matches(self, label):
+        return any(marker in label for marker in self.markers)
+    
+    def _track(self, window, matches=None):
+        """Start following a window's property changes and destruction."""
+        window.change_attributes(event_mask=self._EVENT_MASK, onerror=_ignore_error)
+        self.windows[window.id] = matches
+    
+    def _process_events(self):
+        """Apply every event the server has queued for us."""
+        self.dpy.sync()
+        for _ in range(self.dpy.pending_events()):
+            self._handle_event(self.dpy.next_event())
+    
+    def _handle_event(self, event):
+        """Update the tracked windows from one event."""
+        if event.type == X.CreateNotify:
+            self._track(event.window)
+        elif event.type == X.DestroyNotify:
+            self.windows.pop(event.window.id, None)
+        elif event.type == X.PropertyNotify:
+            if event.atom in (Xatom.WM_NAME, Xatom.WM_CLASS) and event.window.id in self.windows:
+                self.windows[event.window.id] = None
+    
+    def wait_for_map(self, window_id, timeout=0.5):
+        """
+        Wait until a window is mapped (or timeout seconds pass).
+        
+        Returns:
+            True if the window is mapped, False on timeout
+        """
+        window = self.dpy.create_resource_object('window', window_id)
+        window.change_attributes(event_mask=self._EVENT_MASK, onerror=_ignore_error)
+        self.dpy.sync()
+        
+        # Already mapped before we started listening?
+        try:
+            if window.get_attributes().map_state != X.IsUnmapped:
+                return True
+        except (BadWindow, BadDrawable):
+            return False
+        
+        deadline = time.monotonic() + timeout
+        while True:
+            while self.dpy.pending_events():
+                event = self.dpy.next_event()
+                if event.type == X.MapNotify and event.window.id == window_id:
+                    return True
+                self._handle_event(event)
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            select.select([self.dpy.fileno()], [], [], remaining)
+    
+    def count_matching(self):
+        """Count tracked windows whose name or class matches a marker."""
+        self._process_events()
+        
+        count = 0
+        for window_id, matches in list(self.windows.items()):
+            if matches is None:
+                try:
+                    label = _window_label(self.dpy.create_resource_object('window', window_id))
+                except (BadWindow, BadDrawable):
+                    del self.windows[window_id]
+                    continue
+                matches = self.windows[window_id] = self._matches(label)
+            if matches:
+                count += 1
+        return count
+    
+    def close(self):
+        self.dpy.close()
+
+def _get_counter():
+    """Create the shared window counter on first use."""
+    global _COUNTER
+    if _COUNTER is None:
+        _COUNTER = WindowCounter(_WINDOW_MARKERS)
+        atexit.register(_COUNTER.close)
+    return _COUNTER
+
 def count_windows():
     """Count the number of windows."""
     try:
-        result = subprocess.run(['xwininfo', '-tree', '-root'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            # Count non-root windows
-            lines = result.stdout.split('\n')
-            window_count = 0
-            for line in lines:
-                if 'x11-gstreamer-viewer' in line.lower() or 'test' in line.lower():
-                    window_count += 1
-            return window_count
-        return 0
+        return _get_counter().count_matching()
     except Exception:
         return 0
 
@@ -71,8 +207,11 @@ def test_window_creation():
             else:
                 print(f"   ✗ Expected {windows_before + 1} windows, got {windows_after}")
             
-            print("4. Waiting 2 seconds to observe window behavior...")
-            time.sleep(2)
+            print("4. Waiting for the window to be mapped...")
+            if _get_counter().wait_for_map(window_id, timeout=0.5):
+                print("   ✓ Window mapped")
+            else:
+                print("   ✗ Window was not mapped within 0.5 seconds")
             
             print("5. Destroying window...")
             x11_manager.destroy_window()
@@ -108,10 +247,13 @@ def test_multiple_windows():
         
         managers = []
         
+        # One display connection shared by all three windows
+        dpy = display.Display()
+        
         # Create 3 windows
         for i in range(3):
             print(f"Creating window {i+1}...")
-            x11_manager = X11WindowManager()
+            x11_manager = X11WindowManager(dpy=dpy)
             
             if x11_manager.create_window(
                 width=400, height=300,
@@ -138,6 +280,7 @@ def test_multiple_windows():
             manager.destroy_window()
             manager.close()
             print(f"   Destroyed window {i+1}")
+        dpy.close()
         
         windows_final = count_windows()
         print(f"Windows after cleanup: {windows_final}")
@@ -7,6 +7,9 @@ Created by Ruliano Castian - From the streets to the code!
 import pytest
 import tempfile
 import os
+import io
+import json
+import sys
 from x11_gstreamer_viewer.utils.config import Config, VideoConfig, WindowConfig, LoggingConfig
 
 
@@ -97,6 +100,13 @@ class TestLoggingConfig:
 class TestConfig:
     """Test Config class."""
     
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="slotted dataclasses need Python 3.10+")
+    def test_sections_are_slotted(self):
+        """Test that config sections use __slots__ instead of __dict__."""
+        config = Config()
+        for section in (config.video, config.window, config.logging):
+            assert not hasattr(section, "__dict__")
+    
     def test_default_config(self):
         """Test default configuration."""
         config = Config()
@@ -131,20 +141,60 @@ class TestConfig:
             }
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            import json
-            json.dump(config_data, f)
-            config_file = f.name
-        
-        try:
+        # Load from an in-memory file object (no disk round-trip)
+        config = Config(io.StringIO(json.dumps(config_data)))
+        assert config.video.width == 1280
+        assert config.video.height == 720
+        assert config.window.width == 1920
+        assert config.window.height == 1080
+        assert config.logging.level == "DEBUG"
+    
+    def test_config_file_reload_after_change(self):
+        """Test that a changed config file is re-read instead of served from cache."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = os.path.join(tmpdir, "config.json")
+            with open(config_file, 'w') as f:
+                json.dump({"window": {"title": "First"}}, f)
+            
+            assert Config(config_file).window.title == "First"
+            assert Config(config_file).window.title == "First"
+            
+            with open(config_file, 'w') as f:
+                json.dump({"window": {"title": "Second title"}}, f)
+            
+            assert Config(config_file).window.title == "Second title"
+    
+    def test_config_file_reload_after_replace(self):
+        """Test that a file replaced by rename is re-read even with the same size and mtime."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = os.path.join(tmpdir, "config.json")
+            with open(config_file, 'w') as f:
+                json.dump({"window": {"title": "AAAA"}}, f)
+            st = os.stat(config_file)
+            
+            assert Config(config_file).window.title == "AAAA"
+            
+            # Atomic save: write a new file and rename it over the old one,
+            # both writes landing in one timestamp tick
+            new_file = os.path.join(tmpdir, "config.json.new")
+            with open(new_file, 'w') as f:
+                json.dump({"window": {"title": "BBBB"}}, f)
+            os.utime(new_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(new_file, config_file)
+            
+            assert Config(config_file).window.title == "BBBB"
+    
+    def test_save_and_reload(self):
+        """Test saving configuration into a new directory and loading it back."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = os.path.join(tmpdir, "nested", "config.json")
+            
             config = Config(config_file)
-            assert config.video.width == 1280
-            assert config.video.height == 720
-            assert config.window.width == 1920
-            assert config.window.height == 1080
-            assert config.logging.level == "DEBUG"
-        finally:
-            os.unlink(config_file)
+            config.window.title = "Saved Title"
+            config.save()
+            config.save()
+            
+            assert Config(config_file).window.title == "Saved Title"
     
     def test_config_validation(self):
         """Test configuration validation."""
@@ -174,6 +224,22 @@ class TestConfig:
         for device in devices:
             assert device.startswith("/dev/video")
     
+    def test_get_video_devices_filters_missing(self):
+        """Test that only existing devices are returned, in configured order."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("video2", "video0"):
+                open(os.path.join(tmpdir, name), 'w').close()
+            # A dangling symlink is not an available device
+            os.symlink(os.path.join(tmpdir, "gone"), os.path.join(tmpdir, "video3"))
+            
+            config = Config()
+            config.video.devices = [os.path.join(tmpdir, f"video{i}") for i in range(4)]
+            
+            assert config.get_video_devices() == [
+                os.path.join(tmpdir, "video0"),
+                os.path.join(tmpdir, "video2"),
+            ]
+    
     def test_update_from_args(self):
         """Test updating configuration from arguments."""
         config = Config()
@@ -181,8 +247,8 @@ class TestConfig:
         args = {
             "video_width": 1280,
             "video_height": 720,
-            "window_width": 1920,
-            "window_height": 1080,
+            "width": 1920,
+            "height": 1080,
             "title": "Custom Title",
             "log_level": "DEBUG"
         }
@@ -194,4 +260,49 @@ class TestConfig:
         assert config.window.width == 1920
         assert config.window.height == 1080
         assert config.window.title == "Custom Title"
-        assert config.logging.level == "DEBUG"
\ No newline at end of file
+        assert config.logging.level == "DEBUG"
+    
+    def test_update_from_parsed_arguments(self):
+        """Test that every command line option reaches its config field."""
+        from x11_gstreamer_viewer.main import _build_parser
+        
+        config = Config()
+        args = _build_parser().parse_args([
+            "--width", "1280", "--height", "720", "-x", "10", "-y", "20",
+            "--video-width", "640", "--no-console-log",
+        ])
+        
+        config.update_from_args(vars(args))
+        
+        assert (config.window.width, config.window.height) == (1280, 720)
+        assert (config.window.x, config.window.y) == (10, 20)
+        assert config.video.width == 640
+        assert config.logging.console is False
+    
+    def test_pin_threads_option(self):
+        """Test that --pin-threads enables pinning and its absence keeps the file's setting."""
+        from x11_gstreamer_viewer.main import _build_parser
+        
+        config = Config()
+        assert config.video.pin_threads is False
+        config.update_from_args(vars(_build_parser().parse_args(["--pin-threads"])))
+        assert config.video.pin_threads is True
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = os.path.join(tmpdir, "config.json")
+            with open(config_file, 'w') as f:
+                json.dump({"video": {"pin_threads": True}}, f)
+            
+            config = Config(config_file)
+            config.update_from_args(vars(_build_parser().parse_args([])))
+            assert config.video.pin_threads is True
+    
+    def test_update_from_args_skips_unset_values(self):
+        """Test that None arguments do not override existing values."""
+        config = Config()
+        config.logging.file = "/tmp/viewer.log"
+        
+        config.update_from_args({"log_file": None, "no_console_log": True})
+        
+        assert config.logging.file == "/tmp/viewer.log"
+        assert config.logging.console is False
\ No newline at end of file
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+GStreamer Manager Tests
+Created by Ruliano Castian - From the streets to the code!
+
+GStreamer itself is replaced with mocks, so these tests cover the manager's
+own logic and run without gi or any camera attached.
+"""
+
+import importlib
+import struct
+import sys
+import pytest
+from unittest import mock
+
+MODULE = "x11_gstreamer_viewer.core.gstreamer_manager"
+
+
+@pytest.fixture(scope="module")
+def gm():
+    """Import the GStreamer manager module against a mocked gi.repository."""
+    gi = mock.MagicMock()
+    repository = mock.MagicMock()
+    repository.Gst.SECOND = 10 ** 9
+    repository.Gst.CLOCK_TIME_NONE = 2 ** 64 - 1
+    gi.repository = repository
+    
+    modules = {"gi": gi, "gi.repository": repository}
+    with mock.patch.dict(sys.modules, modules):
+        sys.modules.pop(MODULE, None)
+        module = importlib.import_module(MODULE)
+    return module
+
+
+@pytest.fixture
+def manager(gm):
+    """A manager with a faked four-camera pipeline."""
+    manager = gm.GStreamerManager()
+    with mock.patch.object(gm, "_enumerate_capture_devices", return_value=None):
+        manager.initialize()
+    # The mocked main loop returns at once; wait so calls run inline
+    manager._gst_thread.join()
+    
+    manager.pipeline = mock.MagicMock()
+    manager._branch_elements = {i: [mock.MagicMock(), mock.MagicMock()] for i in range(4)}
+    manager._branch_index = {f"src_{i}": i for i in range(4)}
+    return manager
+
+
+def _querycap(capabilities, device_caps=0):
+    """A VIDIOC_QUERYCAP reply with the given capability flags."""
+    info = bytearray(104)
+    struct.pack_into("=II", info, 84, capabilities, device_caps)
+    return bytes(info)
+
+
+class TestInitialize:
+    """Test device probing and thread startup."""
+    
+    def test_init_does_not_probe(self, gm):
+        """Test that constructing the manager touches no devices or threads."""
+        with mock.patch.object(gm, "_enumerate_capture_devices") as enumerate_devices:
+            manager = gm.GStreamerManager()
+        enumerate_devices.assert_not_called()
+        assert manager.video_devices is None
+        assert manager._gst_thread is None
+    
+    def test_initialize_uses_found_devices(self, gm):
+        """Test that initialize keeps one found capture device per grid cell."""
+        found = [f"/dev/video{i}" for i in range(0, 12, 2)]
+        manager = gm.GStreamerManager()
+        with mock.patch.object(gm, "_enumerate_capture_devices", return_value=found) as enumerate_devices:
+            manager.initialize()
+            manager._gst_thread.join()
+            thread = manager._gst_thread
+            manager.initialize()
+        assert manager.video_devices == found[:4]
+        assert enumerate_devices.call_count == 1
+        assert manager._gst_thread is thread
+    
+    def test_initialize_falls_back_to_default_devices(self, gm, manager):
+        """Test the static device list when no capture device is found."""
+        assert manager.video_devices == gm._DEFAULT_VIDEO_DEVICES
+        assert manager.video_devices is not gm._DEFAULT_VIDEO_DEVICES
+
+
+class TestIsCaptureDevice:
+    """Test _is_capture_device filtering."""
+    
+    @pytest.fixture
+    def device(self, gm):
+        """Patch opening and querying a device node."""
+        with mock.patch.object(gm.os, "open", return_value=7), \
+                mock.patch.object(gm.os, "close") as close, \
+                mock.patch.object(gm.fcntl, "ioctl") as ioctl:
+            yield ioctl, close
+    
+    @pytest.mark.parametrize("capabilities, device_caps, expected", [
+        (0x00000001, 0, True),                    # single-planar capture
+        (0x00001000, 0, True),                    # multi-planar capture
+        (0x00000002, 0, False),                   # output only
+        (0x80800001, 0x00000001, True),           # capture node of a UVC camera
+        (0x80800001, 0x00800000, False),          # metadata node of a UVC camera
+    ])
+    def test_capabilities(self, gm, device, capabilities, device_caps, expected):
+        """Test that only video capture nodes are accepted."""
+        ioctl, close = device
+        ioctl.return_value = _querycap(capabilities, device_caps)
+        assert gm._is_capture_device("/dev/video0") is expected
+        assert ioctl.call_args[0][:2] == (7, gm._VIDIOC_QUERYCAP)
+        close.assert_called_once_with(7)
+    
+    def test_querycap_fails(self, gm, device):
+        """Test a node that is not a V4L2 device."""
+        ioctl, close = device
+        ioctl.side_effect = OSError("Inappropriate ioctl for device")
+        assert gm._is_capture_device("/dev/video0") is False
+        close.assert_called_once_with(7)
+    
+    def test_open_fails(self, gm):
+        """Test a node that cannot be opened."""
+        with mock.patch.object(gm.os, "open", side_effect=OSError("busy")), \
+                mock.patch.object(gm.fcntl, "ioctl") as ioctl:
+            assert gm._is_capture_device("/dev/video0") is False
+        ioctl.assert_not_called()
+
+
+class TestPipelineDescription:
+    """Test the parse_launch description."""
+    
+    @staticmethod
+    def _find(missing=()):
+        """ElementFactory.find that knows every element except the missing ones."""
+        return lambda name: None if name in missing else mock.MagicMock()
+    
+    def test_gl_pipeline(self, gm, manager):
+        """Test the GL compositing pipeline."""
+        with mock.patch.object(gm.Gst.ElementFactory, "find", side_effect=self._find()):
+            description = manager._build_pipeline_description()
+        
+        assert description.startswith("glvideomixer name=comp background=black")
+        assert "! glimagesink name=video_sink" in description
+        assert 'caps="video/x-raw(memory:GLMemory),width=3840,height=2160,framerate=30/1"' in description
+        for i, device in enumerate(manager.video_devices):
+            assert f'v4l2src name=src_{i} device="{device}" do-timestamp=true io-mode=4 ' in description
+            assert f"glupload name=upload_{i} ! glcolorconvert name=glconvert_{i} ! comp.sink_{i}" in description
+            assert f"textoverlay name=textoverlay_{i} " in description
+        assert "sink_3::xpos=1920 sink_3::ypos=1080 sink_3::width=1920 sink_3::height=1080" in description
+    
+    def test_software_pipeline(self, gm, manager):
+        """Test the software compositor feeding an Xv sink without textoverlay."""
+        manager.use_gl = False
+        manager.output_size = (1280, 720)
+        with mock.patch.object(gm.Gst.ElementFactory, "find", side_effect=self._find({"textoverlay"})), \
+                mock.patch.object(manager, "_select_video_sink", return_value=("xvimagesink", "YUY2")):
+            description = manager._build_pipeline_description()
+        
+        assert description.startswith("compositor name=comp background=black")
+        assert 'caps="video/x-raw,format=YUY2,width=1280,height=720,framerate=30/1" ! xvimagesink' in description
+        assert "glupload" not in description
+        assert "textoverlay" not in description
+        assert "sink_1::xpos=640 sink_1::ypos=0 sink_1::width=640 sink_1::height=360" in description
+        assert description.count("! comp.sink_") == 4
+
+
+class TestViewLayouts:
+    """Test the precomputed view layouts."""
+    
+    def test_layouts(self, manager):
+        """Test the tiled and single camera layouts."""
+        manager.compositor_sink_pads = [mock.MagicMock() for _ in range(4)]
+        manager.output_size = (1280, 720)
+        layouts = manager._build_view_layouts()
+        
+        assert sorted(layouts) == [-1, 0, 1, 2, 3]
+        assert layouts[-1][3] == dict(xpos=640, ypos=360, width=640, height=360, alpha=1.0)
+        assert layouts[2][2] == dict(xpos=0, ypos=0, width=1280, height=720, alpha=1.0)
+        assert all(layouts[2][i] == dict(alpha=0.0) for i in (0, 1, 3))
+    
+    def test_resize_rebuilds_layouts(self, manager):
+        """Test that a new output size recomputes the layouts once."""
+        manager.compositor_sink_pads = [mock.MagicMock() for _ in range(4)]
+        manager._view_layouts = manager._build_view_layouts()
+        manager.set_output_size(1920, 1080)
+        assert manager._view_layouts[-1][1]["xpos"] == 960
+        assert manager._view_layouts[0][0]["width"] == 1920
+
+
+class TestBranchRecovery:
+    """Test the per-camera error handling."""
+    
+    @staticmethod
+    def _error(name):
+        """An error message from the named element."""
+        message = mock.MagicMock()
+        message.src.get_name.return_value = name
+        message.parse_error.return_value = (mock.MagicMock(message="failed"), "debug")
+        return message
+    
+    def test_dmabuf_falls_back_to_mmap(self, gm, manager):
+        """Test that a DMABUF failure restarts the branch with MMAP at once."""
+        src = manager.pipeline.get_by_name.return_value
+        src.get_property.return_value = gm._IO_MODE_DMABUF
+        with mock.patch.object(gm.GLib, "idle_source_new") as idle, \
+                mock.patch.object(gm.GLib, "timeout_source_new_seconds") as timeout:
+            manager._on_bus_error(None, self._error("src_1"))
+        
+        src.set_property.assert_called_once_with("io-mode", gm._IO_MODE_MMAP)
+        timeout.assert_not_called()
+        for element in manager._branch_elements[1]:
+            element.set_state.assert_called_once_with(gm.Gst.State.NULL)
+        assert 1 in manager._failed_branches
+        
+        # The idle callback brings the branch straight back
+        callback = idle.return_value.set_callback.call_args[0][0]
+        assert callback() == gm.GLib.SOURCE_REMOVE
+        assert 1 not in manager._failed_branches
+        for element in manager._branch_elements[1]:
+            element.sync_state_with_parent.assert_called_once_with()
+    
+    def test_mmap_failure_waits_for_device(self, gm, manager):
+        """Test that other failures retry on a timer."""
+        src = manager.pipeline.get_by_name.return_value
+        src.get_property.return_value = gm._IO_MODE_MMAP
+        with mock.patch.object(gm.GLib, "idle_source_new") as idle, \
+                mock.patch.object(gm.GLib, "timeout_source_new_seconds") as timeout:
+            manager._on_bus_error(None, self._error("src_2"))
+            manager._on_bus_error(None, self._error("src_2"))
+        
+        src.set_property.assert_not_called()
+        idle.assert_not_called()
+        timeout.assert_called_once_with(gm._BRANCH_RETRY_SECONDS)
+        assert manager._failed_branches == {2}
+
+
+class TestThreadPinning:
+    """Test the opt-in streaming thread pinning."""
+    
+    @staticmethod
+    def _playing(gm, src):
+        """A state-changed message for src reaching PLAYING."""
+        message = mock.MagicMock()
+        message.src = src
+        message.parse_state_changed.return_value = (
+            gm.Gst.State.PAUSED, gm.Gst.State.PLAYING, gm.Gst.State.VOID_PENDING)
+        return message
+    
+    def test_disabled_by_default(self, gm, manager):
+        """Test that nothing is pinned unless asked for."""
+        with mock.patch.object(manager, "_pin_branch_threads") as pin:
+            manager._on_state_changed(None, self._playing(gm, manager.pipeline))
+        pin.assert_not_called()
+    
+    def test_pins_when_playing(self, gm, manager):
+        """Test pinning when the pipeline starts playing."""
+        manager.pin_branch_threads = True
+        with mock.patch.object(manager, "_pin_branch_threads") as pin:
+            manager._on_state_changed(None, self._playing(gm, manager.pipeline))
+        pin.assert_called_once_with()
+
+
+class TestCameraHotSwap:
+    """Test remove_camera/add_camera."""
+    
+    @pytest.mark.parametrize("index", [-1, 4, 99])
+    def test_remove_out_of_range(self, manager, index):
+        """Test removing a camera that is not in the pipeline."""
+        assert manager.remove_camera(index) is False
+    
+    @pytest.mark.parametrize("index", [-1, 4, 99])
+    def test_add_out_of_range(self, manager, index):
+        """Test adding a camera that is not in the pipeline."""
+        assert manager.add_camera(index) is False
+        manager.pipeline.get_by_name.assert_not_called()
+    
+    def test_remove_stops_only_that_branch(self, gm, manager):
+        """Test that removing a camera stops its branch and no other."""
+        assert manager.remove_camera(1) is True
+        for element in manager._branch_elements[1]:
+            element.set_locked_state.assert_called_once_with(True)
+            element.set_state.assert_called_once_with(gm.Gst.State.NULL)
+        for i in (0, 2, 3):
+            for element in manager._branch_elements[i]:
+                element.set_state.assert_not_called()
+        manager.pipeline.set_state.assert_not_called()
+    
+    def test_double_removal(self, manager):
+        """Test that removing a camera twice only stops it once."""
+        assert manager.remove_camera(2) is True
+        assert manager.remove_camera(2) is False
+        for element in manager._branch_elements[2]:
+            assert element.set_state.call_count == 1
+    
+    def test_remove_cancels_failure_recovery(self, manager):
+        """Test that a removed camera is not restarted by the unplug retry."""
+        manager._failed_branches.add(0)
+        assert manager.remove_camera(0) is True
+        assert 0 not in manager._failed_branches
+    
+    def test_add_running_camera(self, manager):
+        """Test that adding a camera that is still running does nothing."""
+        assert manager.add_camera(0) is False
+        for element in manager._branch_elements[0]:
+            element.sync_state_with_parent.assert_not_called()
+    
+    def test_remove_then_add(self, manager):
+        """Test restarting a removed camera on another device."""
+        assert manager.remove_camera(3) is True
+        assert manager.add_camera(3, "/dev/video9") is True
+        manager.pipeline.get_by_name.assert_called_with("src_3")
+        manager.pipeline.get_by_name.return_value.set_property.assert_called_with(
+            "device", "/dev/video9")
+        assert manager.video_devices[3] == "/dev/video9"
+        for element in manager._branch_elements[3]:
+            element.set_locked_state.assert_called_with(False)
+            element.sync_state_with_parent.assert_called_once_with()
+        
+        # Running again, so it can be removed again
+        assert manager.add_camera(3) is False
+        assert manager.remove_camera(3) is True
+
+
+class TestDestroyPipeline:
+    """Test pipeline teardown."""
+    
+    def test_pads_released_after_null(self, gm, manager):
+        """Test that the mixer request pads are released once the pipeline is in NULL."""
+        pipeline = manager.pipeline
+        mixer = pipeline.get_by_name.return_value
+        pads = [mock.MagicMock() for _ in range(4)]
+        manager.compositor_sink_pads = list(pads)
+        manager._pipeline_null = False
+        
+        manager.destroy_pipeline()
+        
+        calls = [name for name, _, _ in pipeline.mock_calls]
+        assert calls.index("set_state") < calls.index("get_by_name().release_request_pad")
+        pipeline.set_state.assert_called_once_with(gm.Gst.State.NULL)
+        assert mixer.release_request_pad.call_args_list == [mock.call(pad) for pad in pads]
+        assert manager.pipeline is None
+        assert manager.compositor_sink_pads == []
@@ -11,11 +11,18 @@ __author__ = "Ruliano Castian"
 __email__ = "ruliano@streets2code.dev"
 
 from .core.x11_manager import X11WindowManager
-from .core.gstreamer_manager import GStreamerManager
 from .ui.main_window import MainWindow
 
 __all__ = [
     "X11WindowManager",
     "GStreamerManager", 
     "MainWindow",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """Import GStreamerManager on first access (GStreamer import is slow)."""
+    if name == "GStreamerManager":
+        from .core.gstreamer_manager import GStreamerManager
+        return GStreamerManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,6 +4,13 @@ Created by Ruliano Castian - From the streets to the code!
 """
 
 from .x11_manager import X11WindowManager
-from .gstreamer_manager import GStreamerManager
 
-__all__ = ["X11WindowManager", "GStreamerManager"]
\ No newline at end of file
+__all__ = ["X11WindowManager", "GStreamerManager"]
+
+
+def __getattr__(name):
+    """Import GStreamerManager on first access (GStreamer import is slow)."""
+    if name == "GStreamerManager":
+        from .gstreamer_manager import GStreamerManager
+        return GStreamerManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,19 +6,104 @@ Created by Ruliano Castian - From the streets to the code!
 Manages GStreamer pipeline for 4-way video viewing.
 """
 
+import os
+import fcntl
 import logging
+import struct
 import time
 import gi
-from typing import Optional, List, Dict
-from threading import Lock, Timer
+from typing import Any, Callable, Optional, List, Dict, Set, Tuple
+from threading import Event, Lock, Thread, Timer, current_thread
 
 # GStreamer imports
 gi.require_version('Gst', '1.0')
 gi.require_version('GstVideo', '1.0')
-from gi.repository import Gst, GstVideo
+from gi.repository import GLib, Gst
 
 logger = logging.getLogger(__name__)
 
+# Elements needed to composite on the GPU (glvideomixer -> glimagesink)
+_GL_ELEMENTS = ("glupload", "glcolorconvert", "glvideomixer", "glimagesink")
+
+# JPEG decoders in order of preference (hardware first)
+_JPEG_DECODERS = ("v4l2jpegdec", "vaapijpegdec", "jpegdec")
+
+# Formats the compositor can hand straight to an Xv sink, in order of preference
+_SINK_FORMATS = ("YUY2", "I420", "NV12")
+
+# Per-camera branch element name prefixes, in stream order
+_BRANCH_ELEMENTS = ("src", "srcqueue", "jpeg_caps", "decoder", "convert", "scale", "caps",
+                    "textoverlay", "queue", "upload", "glconvert")
+
+# v4l2src io-mode values (GstV4l2IOMode)
+_IO_MODE_MMAP = 2
+_IO_MODE_DMABUF = 4
+
+# Default cameras when the capture devices can't be enumerated
+_DEFAULT_VIDEO_DEVICES = ["/dev/video0", "/dev/video1", "/dev/video2", "/dev/video3"]
+
+# V4L2 device nodes in sysfs, and VIDIOC_QUERYCAP (struct v4l2_capability is
+# 104 bytes; capabilities and device_caps are the u32s at offset 84)
+_V4L2_SYSFS_DIR = "/sys/class/video4linux"
+_VIDIOC_QUERYCAP = 0x80685600
+_V4L2_CAPABILITY_SIZE = 104
+_V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+_V4L2_CAP_VIDEO_CAPTURE_MPLANE = 0x00001000
+_V4L2_CAP_DEVICE_CAPS = 0x80000000
+
+# Longest wait for the PAUSED (pre-roll) transition before going to PLAYING
+_PREROLL_TIMEOUT = 2 * Gst.SECOND
+
+# How often a failed camera branch checks whether its device is back
+_BRANCH_RETRY_SECONDS = 2
+
+# Low latency sink settings: no clock sync, no QoS events upstream, drop late
+# frames, keep the aspect ratio
+_SINK_PROPERTIES = {"sync": False, "qos": False, "max-lateness": -1, "drop-on-lateness": True,
+                    "force-aspect-ratio": True}
+
+# Mixer settings: no added latency, start output from the first camera frame
+# instead of waiting for every camera (start-time-selection=first), and don't
+# wait for pads of hidden cameras (their buffers are dropped). Not every
+# GStreamer version has all of them.
+_MIXER_PROPERTIES = {"latency": 0, "min-upstream-latency": 0, "start-time-selection": 1,
+                     "ignore-inactive-pads": True}
+
+
+def _is_capture_device(path: str) -> bool:
+    """Check with VIDIOC_QUERYCAP whether a V4L2 node captures video (not e.g. UVC metadata)."""
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return False
+    try:
+        info = fcntl.ioctl(fd, _VIDIOC_QUERYCAP, bytes(_V4L2_CAPABILITY_SIZE))
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    capabilities, device_caps = struct.unpack_from("=II", info, 84)
+    # device_caps describes this node; capabilities covers the whole device
+    if capabilities & _V4L2_CAP_DEVICE_CAPS:
+        capabilities = device_caps
+    return bool(capabilities & (_V4L2_CAP_VIDEO_CAPTURE | _V4L2_CAP_VIDEO_CAPTURE_MPLANE))
+
+
+def _enumerate_capture_devices() -> Optional[List[str]]:
+    """
+    List the video capture device nodes, in node number order.
+    
+    Returns:
+        Device paths, or None if sysfs has no V4L2 class directory
+    """
+    try:
+        names = [name for name in os.listdir(_V4L2_SYSFS_DIR)
+                 if name.startswith("video") and name[5:].isdigit()]
+    except OSError:
+        return None
+    names.sort(key=lambda name: int(name[5:]))
+    return [path for path in (f"/dev/{name}" for name in names) if _is_capture_device(path)]
+
 
 class GStreamerManager:
     """
@@ -30,29 +115,80 @@ class GStreamerManager:
     def __init__(self):
         """Initialize the GStreamer Manager."""
         self.pipeline: Optional[Gst.Pipeline] = None
+        self._sink_element: Optional[Gst.Element] = None
+        self.window_id: Optional[int] = None
+        
+        # Pipeline bus and the IDs of our handlers on it
+        self._bus: Optional[Gst.Bus] = None
+        self._bus_handler_ids: List[int] = []
+        
+        # Per-camera branch elements (stream order) and element name -> camera index
+        self._branch_elements: Dict[int, List[Gst.Element]] = {}
+        self._branch_index: Dict[str, int] = {}
+        self._failed_branches: Set[int] = set()
+        self._removed_branches: Set[int] = set()
+        
+        # Frames dropped per element, from the latest QoS message of each
+        self.qos_dropped: Dict[str, int] = {}
+        
+        # Buffer-dropping probes on hidden cameras: index -> (pad, probe ID)
+        self._drop_probes: Dict[int, Tuple[Gst.Pad, int]] = {}
+        
+        # Mixer output pad and the view layout waiting to be applied on it
+        self._mixer_src_pad: Optional[Gst.Pad] = None
+        self._pending_layout: Optional[Dict[int, Dict[str, Any]]] = None
+        self._layout_lock = Lock()
+        
+        # Pad layout of each view (-1 = tiled, otherwise a camera index), rebuilt
+        # only when the pipeline or the output size changes
+        self._view_layouts: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        
+        # Whether the mixer pads have max-last-buffer-repeat (GStreamer >= 1.18)
+        self._pads_repeat_last_buffer = False
         self.running = False
+        self._pipeline_null = True  # Pipeline is in (or was last set to) NULL state
+        self._last_state = Gst.State.NULL  # Pipeline state from the last state-changed message
         
         # Video configuration
         self.video_width = 1920
         self.video_height = 1080
         
-        # Video devices
-        self.video_devices = ["/dev/video0", "/dev/video1", "/dev/video2", "/dev/video3"]
+        # Compositor grid (cameras fill it row by row)
+        self.grid_columns = 2
+        self.grid_rows = 2
+        
+        # Composited output size (the window size); None means one
+        # capture-size tile per grid cell
+        self.output_size: Optional[Tuple[int, int]] = None
+        self._output_caps_prefix = "video/x-raw"
+        
+        # Composite on the GPU when the GL plugins are available
+        self.use_gl = True
+        
+        # Pin each camera's streaming threads to its own CPU once playing
+        # (opt-in: it fights the scheduler on busy or heterogeneous systems)
+        self.pin_branch_threads = False
         
-        # View state tracking (-1 = tiled, 0-3 = single camera)
+        # Parsed Gst.Caps by caps string, shared across pipeline rebuilds
+        self._caps_cache: Dict[str, Gst.Caps] = {}
+        
+        # Video devices, found by initialize() unless set before it runs
+        self.video_devices: Optional[List[str]] = None
+        
+        # View state tracking (-1 = tiled, otherwise the single camera's index)
         self.current_view = -1
         self.compositor_sink_pads: List[Gst.Pad] = []
         
         # FPS tracking
         self.fps_overlays: Dict[int, Gst.Element] = {}  # Store textoverlay elements by camera index
-        self.fps_values: Dict[int, float] = {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}  # Current FPS per camera
-        self.fps_frame_counts: Dict[int, int] = {0: 0, 1: 0, 2: 0, 3: 0}  # Frame counts
-        self.fps_last_update: Dict[int, float] = {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}  # Last update time
+        self.fps_values: Dict[int, float] = {}  # Current FPS per camera
+        self.fps_frame_counts: Dict[int, int] = {}  # Frame counts
+        self.fps_last_update: Dict[int, float] = {}  # Last update time
         self.fps_lock = Lock()  # Thread safety for FPS updates
         
         # Latency tracking
-        self.latency_values: Dict[int, float] = {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}  # Current latency per camera (ms)
-        self.latency_buffer_times: Dict[int, List[float]] = {0: [], 1: [], 2: [], 3: []}  # Recent latency measurements (ms)
+        self.latency_values: Dict[int, float] = {}  # Current latency per camera (ms)
+        self.latency_buffer_times: Dict[int, List[float]] = {}  # Recent latency measurements (ms)
         
         # FPS overlay visibility
         self.fps_overlay_visible = False  # Track overlay visibility state
@@ -62,15 +198,88 @@ class GStreamerManager:
         # Initialize GStreamer
         self._init_gstreamer()
         
+        # Thread (with its own main context) that runs pipeline state changes,
+        # started by initialize()
+        self._context: Optional[GLib.MainContext] = None
+        self._loop: Optional[GLib.MainLoop] = None
+        self._gst_thread: Optional[Thread] = None
+    
+    def initialize(self) -> None:
+        """
+        Find the video devices and start the GStreamer thread.
+        
+        Called by create_pipeline(); safe to call more than once. Devices are
+        the first capture nodes found (one per grid cell), skipping
+        metadata-only nodes, or the static list if none are found.
+        """
+        if self.video_devices is None:
+            devices = _enumerate_capture_devices()
+            if devices:
+                self.video_devices = devices[:self.grid_columns * self.grid_rows]
+            else:
+                self.video_devices = list(_DEFAULT_VIDEO_DEVICES)
+        
+        if self._gst_thread is None:
+            self._start_gst_thread()
+        
     def _init_gstreamer(self) -> None:
         """Initialize GStreamer."""
         try:
-            Gst.init(None)
+            # Gst.init() takes a global lock even when already initialized
+            if not Gst.is_initialized():
+                Gst.init(None)
             logger.info("GStreamer initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize GStreamer: {e}")
             raise
     
+    def _start_gst_thread(self) -> None:
+        """
+        Start the GStreamer thread.
+        
+        State changes can block for hundreds of milliseconds while devices
+        open and caps negotiate; running them on this thread keeps the X11
+        event loop on the main thread responsive.
+        """
+        self._context = GLib.MainContext.new()
+        self._loop = GLib.MainLoop.new(self._context, False)
+        self._gst_thread = Thread(target=self._run_gst_loop, name="gstreamer", daemon=True)
+        self._gst_thread.start()
+    
+    def _run_gst_loop(self) -> None:
+        """Run the GStreamer thread's main loop."""
+        self._context.push_thread_default()
+        try:
+            self._loop.run()
+        finally:
+            self._context.pop_thread_default()
+    
+    def _invoke(self, func: Callable, *args) -> None:
+        """Run func(*args) on the GStreamer thread without waiting for it."""
+        def callback(*_):
+            func(*args)
+            return GLib.SOURCE_REMOVE
+        self._context.invoke_full(GLib.PRIORITY_DEFAULT, callback)
+    
+    def _invoke_sync(self, func: Callable, *args) -> Any:
+        """Run func(*args) on the GStreamer thread and wait for its result."""
+        if (self._gst_thread is None or current_thread() is self._gst_thread
+                or not self._gst_thread.is_alive()):
+            return func(*args)
+        
+        done = Event()
+        result = []
+        
+        def call():
+            try:
+                result.append(func(*args))
+            finally:
+                done.set()
+        
+        self._invoke(call)
+        done.wait()
+        return result[0] if result else None
+    
     def create_pipeline(self, window_id: Optional[int] = None) -> bool:
         """
         Create the GStreamer pipeline.
@@ -82,60 +291,55 @@ class GStreamerManager:
             True if pipeline created successfully, False otherwise
         """
         try:
+            self.initialize()
             if self.pipeline is not None:
                 logger.warning("Pipeline already exists, destroying it first")
                 self.destroy_pipeline()
             
+            self._last_state = Gst.State.NULL
+            self.qos_dropped = {}
+            
             # Reset view state
             self.current_view = -1
             self.compositor_sink_pads = []
             
-            # Reset FPS tracking
+            # Reset FPS tracking (one entry per camera)
+            cameras = range(len(self.video_devices))
             self.fps_overlays = {}
-            self.fps_values = {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}
-            self.fps_frame_counts = {0: 0, 1: 0, 2: 0, 3: 0}
-            self.fps_last_update = {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}
+            self.fps_values = {i: 0.0 for i in cameras}
+            self.fps_frame_counts = {i: 0 for i in cameras}
+            self.fps_last_update = {i: 0.0 for i in cameras}
             
             # Reset latency tracking
-            self.latency_values = {0: 0.0, 1: 0.0, 2: 0.0, 3: 0.0}
-            self.latency_buffer_times = {0: [], 1: [], 2: [], 3: []}
-            
-            # Create pipeline
-            self.pipeline = Gst.Pipeline.new("video-viewer-pipeline")
-            
-            # Create compositor
-            compositor = Gst.ElementFactory.make("compositor", "comp")
-            if compositor is None:
-                raise Exception("Could not create compositor")
-            
-            # Create video sink
-            sink = self._create_video_sink(window_id)
-            
-            # Add elements to pipeline
-            self.pipeline.add(compositor)
-            self.pipeline.add(sink)
-            
-            # Create video sources and link them
-            self._create_and_link_sources(compositor)
-            
-            # Add explicit caps after compositor for better format negotiation
-            output_caps = Gst.ElementFactory.make("capsfilter", "output_caps")
-            if output_caps is not None:
-                # Compositor output is 2x2 grid: width*2 x height*2
-                output_width = self.video_width * 2
-                output_height = self.video_height * 2
-                caps_str = f"video/x-raw,width={output_width},height={output_height},framerate=30/1"
-                output_caps.set_property("caps", Gst.caps_from_string(caps_str))
-                self.pipeline.add(output_caps)
-                # Link: compositor -> output_caps -> convert -> sink
-                compositor.link(output_caps)
-                output_caps.link(sink)
-                logger.debug(f"Added explicit output caps: {output_width}x{output_height}")
-            else:
-                # Fallback: link compositor directly to sink
-                compositor.link(sink)
-                logger.debug("Could not create output caps filter, linking compositor directly")
+            self.latency_values = {i: 0.0 for i in cameras}
+            self.latency_buffer_times = {i: [] for i in cameras}
+            
+            # Build the whole graph natively in one parse_launch call
+            self.window_id = window_id
+            self.pipeline = Gst.parse_launch(self._build_pipeline_description())
+            self.pipeline.set_name("video-viewer-pipeline")
+            # Live viewer without A/V sync: no pipeline latency, handle async children
+            self.pipeline.set_property("latency", 0)
+            self.pipeline.set_property("async-handling", True)
+            # Pin the system clock so going to PLAYING skips clock selection
+            self.pipeline.use_clock(Gst.SystemClock.obtain())
+            self._pipeline_null = True
+            
+            self._configure_video_sink()
+            self._collect_source_elements()
             
+            # Hand the sink our window when it asks for one (prepare-window-handle)
+            self._bus = self.pipeline.get_bus()
+            self._bus.enable_sync_message_emission()
+            self._bus_handler_ids = [
+                self._bus.connect("sync-message::element", self._on_sync_message),
+                self._bus.connect("message::error", self._on_bus_error),
+                self._bus.connect("message::state-changed", self._on_state_changed),
+                self._bus.connect("message::eos", self._on_bus_eos),
+                self._bus.connect("message::qos", self._on_bus_qos),
+            ]
+            # Async bus messages are dispatched on the GStreamer thread
+            self._invoke_sync(self._bus.add_signal_watch)
             
             logger.info("GStreamer pipeline created successfully")
             return True
@@ -144,119 +348,610 @@ class GStreamerManager:
             logger.error(f"Failed to create pipeline: {e}")
             return False
     
-    def _create_and_link_sources(self, compositor: Gst.Element) -> None:
-        """Create video sources and link them to compositor."""
+    def _build_pipeline_description(self) -> str:
+        """
+        Build the gst-launch description for the complete viewer pipeline.
+        
+        Each source runs v4l2src -> videoconvert -> videoscale -> capsfilter
+        (-> textoverlay) -> queue into a compositor sink pad placed in the grid;
+        the compositor output goes through the output caps to the video sink.
+        
+        With the GL plugins available frames are uploaded once per branch and
+        mixed by glvideomixer into glimagesink, so compositing and presentation
+        stay on the GPU. Otherwise the software compositor feeds an X video sink.
+        """
+        use_gl = self.use_gl and all(Gst.ElementFactory.find(name) is not None for name in _GL_ELEMENTS)
+        
+        has_textoverlay = Gst.ElementFactory.find("textoverlay") is not None
+        if not has_textoverlay:
+            logger.warning("Could not find textoverlay element, FPS display disabled")
+        
+        source_caps = f"video/x-raw,width={self.video_width},height={self.video_height},framerate=30/1"
+        jpeg_caps = f"image/jpeg,width={self.video_width},height={self.video_height},framerate=30/1"
+        jpeg_decoder = self._jpeg_decoder_factory()
+        device_caps = self._probe_device_caps()
+        wanted_jpeg = self._caps(jpeg_caps)
+        wanted_raw = self._caps(source_caps)
+        
+        # Raw formats every element after the branch capsfilter accepts as-is
+        downstream = ["textoverlay"] if has_textoverlay else []
+        downstream.append("glupload" if use_gl else "compositor")
+        downstream_caps = self._sink_template_caps(downstream)
+        
+        branches = []
+        pad_props = []
         for i, device in enumerate(self.video_devices):
+            # DMABUF capture avoids a userspace copy; falls back to MMAP on error.
+            # Only the latest frame is kept after capture.
+            branch = (
+                f'v4l2src name=src_{i} device="{device}" do-timestamp=true io-mode={_IO_MODE_DMABUF} '
+                f'! queue name=srcqueue_{i} max-size-buffers=1 max-size-bytes=0 '
+                f'max-size-time=0 leaky=downstream silent=true '
+            )
+            caps = device_caps.get(device)
+            native_size = True
+            needs_convert = True
+            branch_caps = source_caps
+            branch_height = self.video_height
+            if caps is not None and jpeg_decoder and caps.can_intersect(wanted_jpeg):
+                # Capture MJPEG and decode it (in hardware where possible)
+                logger.info(f"Using MJPEG capture with {jpeg_decoder} for device {device}")
+                branch += (
+                    f'! capsfilter name=jpeg_caps_{i} caps="{jpeg_caps}" '
+                    f'! {jpeg_decoder} name=decoder_{i} '
+                )
+                # Convert only if the decoder may output a format downstream can't take
+                decoded_caps = self._src_template_caps(jpeg_decoder)
+                needs_convert = decoded_caps.is_empty() or not decoded_caps.is_subset(downstream_caps)
+            elif caps is not None and caps.can_intersect(wanted_raw):
+                logger.info(f"Using native {self.video_width}x{self.video_height} capture for device {device}")
+                # Camera format usable downstream as-is: no conversion copy
+                needs_convert = not caps.intersect(wanted_raw).can_intersect(downstream_caps)
+            elif caps is not None and (size := self._nearest_capture_size(caps)) is not None:
+                # Capture at the closest size the camera offers; the mixer pad
+                # scales it to the tile (on the GPU with glvideomixer)
+                capture_width, branch_height = size
+                logger.info(f"Using {capture_width}x{branch_height} capture for device {device}, scaled by the mixer")
+                branch_caps = f"video/x-raw,width={capture_width},height={branch_height},framerate=30/1"
+                needs_convert = not caps.intersect(self._caps(branch_caps)).can_intersect(downstream_caps)
+            else:
+                native_size = False
+            
+            if needs_convert:
+                branch += f'! videoconvert name=convert_{i} '
+            if not native_size:
+                # Camera can't deliver the target size itself, scale on the CPU
+                branch += f'! videoscale name=scale_{i} '
+            # Without videoscale these caps propagate back to the camera
+            branch += f'! capsfilter name=caps_{i} caps="{branch_caps}" '
+            if has_textoverlay:
+                # Bottom-left, 40 pixels from the bottom, white text with black outline
+                branch += (
+                    f'! textoverlay name=textoverlay_{i} text="0.0 FPS | 0.0ms" '
+                    f'valignment=2 halignment=0 xpos=10 ypos={branch_height - 40} '
+                    f'font-desc="Sans, 12" color={0xFFFFFFFF} draw-outline=true '
+                    f'outline-color={0x000000FF} '
+                )
+            # Small leaky queue so a slow compositor drops stale frames instead
+            # of stalling the capture thread
+            branch += (
+                f"! queue name=queue_{i} max-size-buffers=2 max-size-bytes=0 "
+                f"max-size-time=0 leaky=downstream silent=true "
+            )
+            if use_gl:
+                branch += f"! glupload name=upload_{i} ! glcolorconvert name=glconvert_{i} "
+            branches.append(branch + f"! comp.sink_{i}")
+            
+            xpos, ypos = self._tile_position(i)
+            tile_width, tile_height = self._tile_size
+            pad_props.append(
+                f"sink_{i}::xpos={xpos} sink_{i}::ypos={ypos} "
+                f"sink_{i}::width={tile_width} sink_{i}::height={tile_height} "
+                f"sink_{i}::alpha=1.0"
+            )
+        
+        if use_gl:
+            logger.info("Created glimagesink for window embedding (GL compositing)")
+            mixer, output = "glvideomixer name=comp background=black", "! glimagesink name=video_sink"
+            self._output_caps_prefix = "video/x-raw(memory:GLMemory)"
+        else:
+            # Plain black background is cheaper to fill than the default checkerboard
+            mixer = "compositor name=comp background=black"
+            sink_factory, sink_format = self._select_video_sink()
+            if sink_factory == "glimagesink":
+                # glimagesink uploads and converts on the GPU, no CPU convert
+                output = f"! {sink_factory} name=video_sink"
+                self._output_caps_prefix = "video/x-raw"
+            elif sink_format is not None:
+                # Compositor outputs a format the sink displays directly, no convert
+                output = f"! {sink_factory} name=video_sink"
+                self._output_caps_prefix = f"video/x-raw,format={sink_format}"
+            else:
+                output = f"! videoconvert name=final_convert ! {sink_factory} name=video_sink"
+                self._output_caps_prefix = "video/x-raw"
+        
+        return " ".join([
+            mixer, *pad_props,
+            f'! capsfilter name=output_caps caps="{self._output_caps_string()}"',
+            output,
+            *branches,
+        ])
+    
+    def _caps(self, caps_str: str) -> Gst.Caps:
+        """Get the Gst.Caps for a caps string, parsing each string only once."""
+        caps = self._caps_cache.get(caps_str)
+        if caps is None:
+            caps = self._caps_cache[caps_str] = Gst.Caps.from_string(caps_str)
+        return caps
+    
+    def _nearest_capture_size(self, caps: Gst.Caps) -> Optional[Tuple[int, int]]:
+        """
+        Find the raw capture size closest (in pixel count) to the target size.
+        
+        Args:
+            caps: Capture caps reported by the device
+            
+        Returns:
+            (width, height) available at 30 fps, or None if there is none
+        """
+        target = self.video_width * self.video_height
+        best = None
+        for i in range(caps.get_size()):
+            structure = caps.get_structure(i)
+            if structure.get_name() != "video/x-raw":
+                continue
+            has_width, width = structure.get_int("width")
+            has_height, height = structure.get_int("height")
+            if not (has_width and has_height):
+                continue
+            if not caps.can_intersect(self._caps(f"video/x-raw,width={width},height={height},framerate=30/1")):
+                continue
+            distance = abs(width * height - target)
+            if best is None or distance < best[0]:
+                best = (distance, width, height)
+        return best[1:] if best is not None else None
+    
+    def _sink_template_caps(self, factories: List[str]) -> Gst.Caps:
+        """Intersect the sink pad template caps of the given element factories."""
+        result = Gst.Caps.new_any()
+        for name in factories:
+            factory = Gst.ElementFactory.find(name)
+            if factory is None:
+                return Gst.Caps.new_empty()
+            for template in factory.get_static_pad_templates():
+                if template.direction == Gst.PadDirection.SINK:
+                    result = result.intersect(template.get_caps())
+        return result
+    
+    def _src_template_caps(self, factory_name: str) -> Gst.Caps:
+        """Get the src pad template caps of an element factory (empty if unknown)."""
+        factory = Gst.ElementFactory.find(factory_name)
+        if factory is not None:
+            for template in factory.get_static_pad_templates():
+                if template.direction == Gst.PadDirection.SRC:
+                    return template.get_caps()
+        return Gst.Caps.new_empty()
+    
+    def _jpeg_decoder_factory(self) -> Optional[str]:
+        """Pick the preferred available JPEG decoder, if any."""
+        for name in _JPEG_DECODERS:
+            if Gst.ElementFactory.find(name) is not None:
+                return name
+        return None
+    
+    def _probe_device_caps(self) -> Dict[str, Gst.Caps]:
+        """Get the capture caps of each video device, keyed by device path."""
+        device_caps: Dict[str, Gst.Caps] = {}
+        try:
+            monitor = Gst.DeviceMonitor.new()
+            monitor.add_filter("Video/Source", None)
+            monitor.start()
             try:
-                # Create source elements
-                src = Gst.ElementFactory.make("v4l2src", f"src_{i}")
-                convert = Gst.ElementFactory.make("videoconvert", f"convert_{i}")
-                scale = Gst.ElementFactory.make("videoscale", f"scale_{i}")
-                caps = Gst.ElementFactory.make("capsfilter", f"caps_{i}")
-                
-                # Create text overlay for FPS display
-                textoverlay = Gst.ElementFactory.make("textoverlay", f"textoverlay_{i}")
-                
-                if not all([src, convert, scale, caps]):
-                    logger.warning(f"Could not create elements for device {device}")
-                    continue
-                
-                if textoverlay is None:
-                    logger.warning(f"Could not create textoverlay element for device {device}, FPS display disabled")
-                
-                # Set properties
-                src.set_property("device", device)
-                # Configure v4l2src for low latency
+                for device in monitor.get_devices():
+                    props = device.get_properties()
+                    if props is None:
+                        continue
+                    path = props.get_string("device.path") or props.get_string("api.v4l2.path")
+                    if path in self.video_devices:
+                        device_caps[path] = device.get_caps()
+            finally:
+                monitor.stop()
+        except Exception as e:
+            logger.debug(f"Could not probe video device caps: {e}")
+        return device_caps
+    
+    def _select_video_sink(self) -> Tuple[str, Optional[str]]:
+        """
+        Pick the video sink for the software compositor.
+        
+        glimagesink is preferred (frames are converted and presented on the
+        GPU), then xvimagesink (the Xv adaptor scales and converts, no copy
+        into X shared memory), then ximagesink. xvimagesink is only used if
+        it can actually open the display, i.e. the X server has a usable Xv
+        adaptor. kmssink is not an option: it drives the display directly and
+        cannot render into our X11 window.
+        
+        Returns:
+            (factory name, raw format the sink takes directly or None)
+        """
+        if self.use_gl and Gst.ElementFactory.find("glimagesink") is not None:
+            logger.info("Created glimagesink for window embedding")
+            return "glimagesink", None
+        
+        available = [name for name in ("xvimagesink", "ximagesink")
+                     if Gst.ElementFactory.find(name) is not None]
+        if not available:
+            raise Exception("Could not create any X11 video sink")
+        for factory in available:
+            opened, sink_format = self._negotiate_sink_format(factory)
+            if opened:
+                logger.info(f"Created {factory} for window embedding")
+                return factory, sink_format
+            logger.info(f"{factory} cannot open the display")
+        # Nothing opened (no display yet?), keep the preferred sink
+        logger.info(f"Created {available[0]} for window embedding")
+        return available[0], None
+    
+    def _negotiate_sink_format(self, factory: str) -> Tuple[bool, Optional[str]]:
+        """
+        Open a video sink and find a preferred raw format it accepts directly.
+        
+        The sink's real formats are only known once it has opened the display
+        (READY state), so a throwaway instance is brought up to query them.
+        
+        Returns:
+            (whether the sink could open the display, format name or None
+            if it could not be determined)
+        """
+        sink = Gst.ElementFactory.make(factory, None)
+        if sink is None:
+            return False, None
+        try:
+            if sink.set_state(Gst.State.READY) == Gst.StateChangeReturn.FAILURE:
+                return False, None
+            caps = sink.get_static_pad("sink").query_caps(None)
+            # Template caps (no format field) mean nothing was learnt from the display
+            if not any(caps.get_structure(i).has_field("format") for i in range(caps.get_size())):
+                return True, None
+            for fmt in _SINK_FORMATS:
+                if caps.can_intersect(self._caps(f"video/x-raw,format={fmt}")):
+                    logger.debug(f"Video sink accepts {fmt} directly")
+                    return True, fmt
+        except Exception as e:
+            logger.debug(f"Could not query video sink formats: {e}")
+        finally:
+            sink.set_state(Gst.State.NULL)
+        return True, None
+    
+    def _configure_video_sink(self) -> None:
+        """Configure the video sink for low latency."""
+        self._sink_element = self.pipeline.get_by_name("video_sink")
+        self._set_supported_properties(self._sink_element, _SINK_PROPERTIES)
+        logger.debug("Configured sink for low latency (VSYNC disabled)")
+    
+    def _set_supported_properties(self, element: Gst.Element, properties: Dict[str, Any]) -> None:
+        """Set the properties the element has, skipping those it lacks (other sinks, older GStreamer)."""
+        for name, value in properties.items():
+            if element.find_property(name) is not None:
+                element.set_property(name, value)
+            else:
+                logger.debug("%s has no %s property", element.get_name(), name)
+    
+    @property
+    def output_width(self) -> int:
+        """Width of the composited output (by default one video per grid column)."""
+        if self.output_size is not None:
+            return self.output_size[0]
+        return self.video_width * self.grid_columns
+    
+    @property
+    def output_height(self) -> int:
+        """Height of the composited output (by default one video per grid row)."""
+        if self.output_size is not None:
+            return self.output_size[1]
+        return self.video_height * self.grid_rows
+    
+    @property
+    def _tile_size(self) -> Tuple[int, int]:
+        """Size of one grid cell in the composited output."""
+        return self.output_width // self.grid_columns, self.output_height // self.grid_rows
+    
+    def _tile_position(self, index: int) -> Tuple[int, int]:
+        """Get the (xpos, ypos) of a camera in the grid."""
+        row, column = divmod(index, self.grid_columns)
+        tile_width, tile_height = self._tile_size
+        return column * tile_width, row * tile_height
+    
+    def _output_caps_string(self) -> str:
+        """Caps of the mixer output at the current output size."""
+        return (f"{self._output_caps_prefix},width={self.output_width},"
+                f"height={self.output_height},framerate=30/1")
+    
+    def _build_view_layouts(self) -> Dict[int, Dict[int, Dict[str, Any]]]:
+        """Pad properties (pad index -> properties) of every view, keyed by view."""
+        pad_count = len(self.compositor_sink_pads)
+        tile_width, tile_height = self._tile_size
+        tiled = {}
+        for i in range(pad_count):
+            xpos, ypos = self._tile_position(i)
+            tiled[i] = dict(xpos=xpos, ypos=ypos, width=tile_width,
+                            height=tile_height, alpha=1.0)
+        layouts = {-1: tiled}
+        
+        fullscreen = dict(xpos=0, ypos=0, width=self.output_width,
+                          height=self.output_height, alpha=1.0)
+        hidden = dict(alpha=0.0)
+        for camera_index in range(pad_count):
+            layouts[camera_index] = {i: fullscreen if i == camera_index else hidden
+                                     for i in range(pad_count)}
+        return layouts
+    
+    def set_output_size(self, width: int, height: int) -> None:
+        """
+        Composite at a new output size, e.g. after the window was resized.
+        
+        Only the mixer output caps and the pad layout change; the pipeline
+        keeps playing and the mixer renegotiates its output.
+        """
+        if (width, height) == (self.output_width, self.output_height):
+            return
+        self.output_size = (width, height)
+        if self.pipeline is None:
+            return
+        try:
+            output_caps = self.pipeline.get_by_name("output_caps")
+            output_caps.set_property("caps", self._caps(self._output_caps_string()))
+            self._view_layouts = self._build_view_layouts()
+            if self.current_view == -1:
+                self._set_tiled_view()
+            else:
+                self._set_single_camera_view(self.current_view)
+            logger.info(f"Output size changed to {width}x{height}")
+        except Exception as e:
+            logger.error(f"Failed to change output size: {e}")
+    
+    def _collect_source_elements(self) -> None:
+        """Look up compositor pads and overlays and attach the FPS probes."""
+        compositor = self.pipeline.get_by_name("comp")
+        self._mixer_src_pad = compositor.get_static_pad("src")
+        self._pending_layout = None
+        self._set_supported_properties(compositor, _MIXER_PROPERTIES)
+        
+        self._drop_probes = {}
+        self._branch_elements = {}
+        self._branch_index = {}
+        self._failed_branches = set()
+        self._removed_branches = set()
+        for i, device in enumerate(self.video_devices):
+            elements = [self.pipeline.get_by_name(f"{prefix}_{i}") for prefix in _BRANCH_ELEMENTS]
+            self._branch_elements[i] = [element for element in elements if element is not None]
+            for element in self._branch_elements[i]:
+                self._branch_index[element.get_name()] = i
+            
+            sink_pad = compositor.get_static_pad(f"sink_{i}")
+            if sink_pad is not None:
+                # Store sink pad for view switching
+                self.compositor_sink_pads.append(sink_pad)
+            
+            textoverlay = self.pipeline.get_by_name(f"textoverlay_{i}")
+            if textoverlay is not None:
+                self.fps_overlays[i] = textoverlay
+                # Set up FPS measurement using pad probe on caps output
+                self._setup_fps_measurement(self.pipeline.get_by_name(f"caps_{i}"), i)
+            
+            logger.info(f"Created and linked video source {i} for device {device}")
+        
+        self._view_layouts = self._build_view_layouts()
+        # Checked once here instead of failing on every view switch
+        self._pads_repeat_last_buffer = bool(self.compositor_sink_pads) and (
+            self.compositor_sink_pads[0].find_property("max-last-buffer-repeat") is not None
+        )
+    
+    def _on_bus_error(self, bus: Gst.Bus, message: Gst.Message) -> None:
+        """
+        Handle pipeline errors (runs on the GStreamer thread).
+        
+        An error from a camera branch (e.g. the device was unplugged) only
+        stops that branch; the other cameras keep playing and the branch is
+        restarted once its device node is back.
+        """
+        err, debug = message.parse_error()
+        name = message.src.get_name() if message.src is not None else "pipeline"
+        index = self._branch_index.get(name)
+        if index is None:
+            logger.error(f"Pipeline error from {name}: {err.message}")
+            logger.debug(f"Error details: {debug}")
+            return
+        
+        if index in self._failed_branches or index in self._removed_branches:
+            return
+        
+        self._failed_branches.add(index)
+        self._stop_branch(index)
+        pipeline = self.pipeline
+        
+        # Not every driver can export DMABUF; restart right away with MMAP
+        # capture (if that fails too, the next error takes the path below)
+        src = pipeline.get_by_name(f"src_{index}")
+        if src is not None and src.get_property("io-mode") == _IO_MODE_DMABUF:
+            logger.info(f"Camera {index} cannot capture to DMABUF ({err.message}), using MMAP")
+            src.set_property("io-mode", _IO_MODE_MMAP)
+            source = GLib.idle_source_new()
+            source.set_callback(lambda *_: self._restart_branch(pipeline, index))
+            source.attach(self._context)
+            return
+        
+        logger.warning(f"Camera {index} ({self.video_devices[index]}) failed: {err.message}")
+        source = GLib.timeout_source_new_seconds(_BRANCH_RETRY_SECONDS)
+        source.set_callback(lambda *_: self._retry_branch(pipeline, index))
+        source.attach(self._context)
+    
+    def _on_bus_eos(self, bus: Gst.Bus, message: Gst.Message) -> None:
+        """Handle end of stream: every camera branch has stopped sending frames."""
+        logger.warning("Pipeline reached end of stream, no camera is delivering frames")
+        self.running = False
+    
+    def _on_bus_qos(self, bus: Gst.Bus, message: Gst.Message) -> None:
+        """Record how many frames an element dropped for being late."""
+        _, processed, dropped = message.parse_qos_stats()
+        name = message.src.get_name() if message.src is not None else "pipeline"
+        self.qos_dropped[name] = dropped
+        logger.debug("QoS from %s: %d processed, %d dropped", name, processed, dropped)
+    
+    def _on_state_changed(self, bus: Gst.Bus, message: Gst.Message) -> None:
+        """Track the pipeline state and pin streaming threads when playback (re)starts."""
+        _, new_state, _ = message.parse_state_changed()
+        if message.src is self.pipeline:
+            self._last_state = new_state
+        if not self.pin_branch_threads or new_state != Gst.State.PLAYING:
+            return
+        if message.src is self.pipeline or message.src.get_name().startswith("src_"):
+            self._pin_branch_threads()
+    
+    def _pin_branch_threads(self) -> None:
+        """
+        Pin each camera branch's streaming threads to one CPU.
+        
+        GStreamer names streaming threads after their pad ("src_0:src",
+        "queue_0:src"), which is how they are matched to a branch here.
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            return
+        try:
+            cpus = sorted(os.sched_getaffinity(0))
+            if len(cpus) < 2:
+                return
+            
+            chosen: Dict[int, int] = {}
+            for task in os.scandir("/proc/self/task"):
                 try:
-                    src.set_property("do-timestamp", True)  # Use timestamps from device
-                    logger.debug(f"Configured v4l2src {i} for low latency")
-                except Exception as e:
-                    logger.debug(f"Could not set do-timestamp on v4l2src {i}: {e}")
-                
-                # Add framerate to caps for better format negotiation
-                caps_str = f"video/x-raw,width={self.video_width},height={self.video_height},framerate=30/1"
-                caps.set_property("caps", Gst.caps_from_string(caps_str))
-                
-                # Configure text overlay for FPS and latency display
-                if textoverlay is not None:
-                    textoverlay.set_property("text", "0.0 FPS | 0.0ms")
-                    textoverlay.set_property("valignment", 2)  # Bottom alignment
-                    textoverlay.set_property("halignment", 0)  # Left alignment
-                    textoverlay.set_property("xpos", 10)  # 10 pixels from left
-                    # Position at bottom: video_height - offset (accounting for text height ~30px)
-                    textoverlay.set_property("ypos", self.video_height - 40)  # 40 pixels from bottom
-                    textoverlay.set_property("font-desc", "Sans, 12")  # Font size (half of 24)
-                    textoverlay.set_property("color", 0xFFFFFFFF)  # White text
-                    textoverlay.set_property("draw-outline", True)  # Enable outline
-                    textoverlay.set_property("outline-color", 0x000000FF)  # Black outline
-                    self.fps_overlays[i] = textoverlay
-                
-                # Add to pipeline
-                elements_to_add = [src, convert, scale, caps]
-                if textoverlay is not None:
-                    elements_to_add.append(textoverlay)
-                
-                for element in elements_to_add:
-                    if element is not None:
-                        self.pipeline.add(element)
-                
-                # Link elements: src -> convert -> scale -> caps -> textoverlay -> compositor
-                src.link(convert)
-                convert.link(scale)
-                scale.link(caps)
-                
-                if textoverlay is not None:
-                    caps.link(textoverlay)
-                    # Set up FPS measurement using pad probe on caps output
-                    self._setup_fps_measurement(caps, i)
-                    # Link textoverlay to compositor
-                    sink_pad = compositor.get_request_pad(f"sink_{i}")
-                    if sink_pad:
-                        textoverlay_pad = textoverlay.get_static_pad("src")
-                        if textoverlay_pad:
-                            textoverlay_pad.link(sink_pad)
-                            # Set compositor sink properties
-                            self._set_compositor_sink_properties(sink_pad, i)
-                            # Store sink pad for view switching
-                            self.compositor_sink_pads.append(sink_pad)
-                            logger.info(f"Created and linked video source {i} for device {device} with FPS display")
-                else:
-                    # Fallback: link caps directly to compositor if textoverlay not available
-                    sink_pad = compositor.get_request_pad(f"sink_{i}")
-                    if sink_pad:
-                        caps_pad = caps.get_static_pad("src")
-                        if caps_pad:
-                            caps_pad.link(sink_pad)
-                            # Set compositor sink properties
-                            self._set_compositor_sink_properties(sink_pad, i)
-                            # Store sink pad for view switching
-                            self.compositor_sink_pads.append(sink_pad)
-                            logger.info(f"Created and linked video source {i} for device {device}")
+                    with open(os.path.join(task.path, "comm")) as f:
+                        comm = f.read().strip()
+                except OSError:
+                    continue
                 
-            except Exception as e:
-                logger.error(f"Failed to create video source {i}: {e}")
+                element = comm.partition(":")[0]
+                index = self._branch_index.get(element)
+                if index is not None:
+                    cpu = cpus[index % len(cpus)]
+                    os.sched_setaffinity(int(task.name), {cpu})
+                    chosen[index] = cpu
+            if chosen:
+                logger.info("Pinned camera streaming threads: %s",
+                            ", ".join(f"camera {i} -> CPU {cpu}" for i, cpu in sorted(chosen.items())))
+        except Exception as e:
+            logger.debug(f"Could not pin streaming threads: {e}")
     
-    def _set_compositor_sink_properties(self, sink_pad: Gst.Pad, index: int) -> None:
-        """Set compositor sink properties for positioning."""
+    def _stop_branch(self, index: int) -> None:
+        """Shut down one camera branch, leaving the rest of the pipeline running."""
+        for element in self._branch_elements.get(index, []):
+            # Keep pipeline-wide state changes from touching it until restarted
+            element.set_locked_state(True)
+            element.set_state(Gst.State.NULL)
+    
+    def _start_branch(self, index: int) -> None:
+        """Bring a stopped camera branch back to the pipeline's state."""
+        for element in reversed(self._branch_elements.get(index, [])):
+            element.set_locked_state(False)
+            element.sync_state_with_parent()
+    
+    def _restart_branch(self, pipeline: Gst.Pipeline, index: int) -> bool:
+        """Restart a failed branch right away (GLib idle callback)."""
+        if pipeline is self.pipeline and index in self._failed_branches:
+            self._failed_branches.discard(index)
+            self._start_branch(index)
+        return GLib.SOURCE_REMOVE
+    
+    def _retry_branch(self, pipeline: Gst.Pipeline, index: int) -> bool:
+        """Restart a failed branch once its device exists again (GLib timeout callback)."""
+        if pipeline is not self.pipeline or index not in self._failed_branches:
+            return GLib.SOURCE_REMOVE
+        
+        device = self.video_devices[index]
+        if not os.path.exists(device):
+            return GLib.SOURCE_CONTINUE
+        
+        logger.info(f"Device {device} is back, restarting camera {index}")
+        self._failed_branches.discard(index)
+        self._start_branch(index)
+        return GLib.SOURCE_REMOVE
+    
+    def _remove_branch(self, index: int) -> bool:
+        """Stop a camera branch for good (runs on the GStreamer thread)."""
+        if index in self._removed_branches:
+            return False
+        # A removed camera is not restarted by the unplug recovery
+        self._removed_branches.add(index)
+        self._failed_branches.discard(index)
+        self._stop_branch(index)
+        return True
+    
+    def _add_branch(self, index: int, device: Optional[str]) -> bool:
+        """Restart a removed or failed camera branch (runs on the GStreamer thread)."""
+        if index not in self._removed_branches and index not in self._failed_branches:
+            return False
+        if device is not None:
+            # The branch is in NULL, so the device can be changed
+            self.pipeline.get_by_name(f"src_{index}").set_property("device", device)
+            self.video_devices[index] = device
+        self._removed_branches.discard(index)
+        self._failed_branches.discard(index)
+        self._start_branch(index)
+        return True
+    
+    def remove_camera(self, index: int) -> bool:
+        """
+        Stop one camera branch while the other cameras keep streaming.
+        
+        Args:
+            index: Camera index
+            
+        Returns:
+            True if the camera was stopped, False otherwise
+        """
+        if index not in self._branch_elements:
+            logger.warning(f"No camera {index} to remove")
+            return False
+        try:
+            if not self._invoke_sync(self._remove_branch, index):
+                logger.warning(f"Camera {index} is already removed")
+                return False
+            # Let the tile go black instead of freezing on the last frame
+            self._set_last_buffer_repeat(index, 0)
+            logger.info(f"Removed camera {index} ({self.video_devices[index]})")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to remove camera {index}: {e}")
+            return False
+    
+    def add_camera(self, index: int, device: Optional[str] = None) -> bool:
+        """
+        Restart a removed camera branch, optionally on another device.
+        
+        The branch keeps the capture format chosen when the pipeline was
+        built, so a replacement device must offer the same format.
+        
+        Args:
+            index: Camera index
+            device: New device path (None keeps the current one)
+            
+        Returns:
+            True if the camera was restarted, False otherwise
+        """
+        if index not in self._branch_elements:
+            logger.warning(f"No camera {index} to add")
+            return False
         try:
-            if index == 0:
-                sink_pad.set_property("xpos", 0)
-                sink_pad.set_property("ypos", 0)
-            elif index == 1:
-                sink_pad.set_property("xpos", self.video_width)
-                sink_pad.set_property("ypos", 0)
-            elif index == 2:
-                sink_pad.set_property("xpos", 0)
-                sink_pad.set_property("ypos", self.video_height)
-            elif index == 3:
-                sink_pad.set_property("xpos", self.video_width)
-                sink_pad.set_property("ypos", self.video_height)
-            
-            sink_pad.set_property("width", self.video_width)
-            sink_pad.set_property("height", self.video_height)
-            sink_pad.set_property("alpha", 1.0)
+            if not self._invoke_sync(self._add_branch, index, device):
+                logger.warning(f"Camera {index} is already running")
+                return False
+            if index not in self._drop_probes:
+                self._set_last_buffer_repeat(index, Gst.CLOCK_TIME_NONE)
+            logger.info(f"Added camera {index} ({self.video_devices[index]})")
+            return True
         except Exception as e:
-            logger.debug(f"Could not set compositor sink {index} properties: {e}")
+            logger.error(f"Failed to add camera {index}: {e}")
+            return False
     
     def cycle_view(self) -> None:
         """Cycle through views: Tiled ? Camera 0 ? Camera 1 ? Camera 2 ? Camera 3 ? Tiled."""
@@ -265,60 +960,102 @@ class GStreamerManager:
                 logger.warning("No compositor sink pads available for view switching")
                 return
             
-            output_width = self.video_width * 2
-            output_height = self.video_height * 2
-            
             self.current_view += 1
-            if self.current_view > 3:
+            if self.current_view >= len(self.compositor_sink_pads):
                 self.current_view = -1
             
             if self.current_view == -1:
-                self._set_tiled_view(output_width, output_height)
-                logger.info("Switched to tiled view (4-way split)")
+                self._set_tiled_view()
+                logger.info(f"Switched to tiled view ({self.grid_columns}x{self.grid_rows} grid)")
             else:
-                self._set_single_camera_view(self.current_view, output_width, output_height)
+                self._set_single_camera_view(self.current_view)
                 logger.info(f"Switched to single camera view: Camera {self.current_view}")
         except Exception as e:
             logger.error(f"Failed to cycle view: {e}")
 
-    def _set_tiled_view(self, output_width: int, output_height: int) -> None:
-        """Set compositor to show all cameras in tiled (2x2) view."""
+    def _set_tiled_view(self) -> None:
+        """Set compositor to show all cameras in the tiled grid view."""
         try:
-            for i, sink_pad in enumerate(self.compositor_sink_pads):
-                if i == 0:
-                    sink_pad.set_property("xpos", 0)
-                    sink_pad.set_property("ypos", 0)
-                elif i == 1:
-                    sink_pad.set_property("xpos", self.video_width)
-                    sink_pad.set_property("ypos", 0)
-                elif i == 2:
-                    sink_pad.set_property("xpos", 0)
-                    sink_pad.set_property("ypos", self.video_height)
-                elif i == 3:
-                    sink_pad.set_property("xpos", self.video_width)
-                    sink_pad.set_property("ypos", self.video_height)
-                
-                sink_pad.set_property("width", self.video_width)
-                sink_pad.set_property("height", self.video_height)
-                sink_pad.set_property("alpha", 1.0)
+            for i in list(self._drop_probes):
+                self._resume_branch_buffers(i)
+            
+            self._apply_layout(self._view_layouts[-1])
         except Exception as e:
             logger.error(f"Failed to set tiled view: {e}")
 
-    def _set_single_camera_view(self, camera_index: int, output_width: int, output_height: int) -> None:
+    def _set_single_camera_view(self, camera_index: int) -> None:
         """Set compositor to show single camera fullscreen."""
         try:
-            for i, sink_pad in enumerate(self.compositor_sink_pads):
+            for i in range(len(self.compositor_sink_pads)):
                 if i == camera_index:
-                    sink_pad.set_property("xpos", 0)
-                    sink_pad.set_property("ypos", 0)
-                    sink_pad.set_property("width", output_width)
-                    sink_pad.set_property("height", output_height)
-                    sink_pad.set_property("alpha", 1.0)
+                    self._resume_branch_buffers(i)
                 else:
-                    sink_pad.set_property("alpha", 0.0)
+                    self._drop_branch_buffers(i)
+            self._apply_layout(self._view_layouts[camera_index])
         except Exception as e:
             logger.error(f"Failed to set single camera view: {e}")
     
+    def _apply_layout(self, layout: Dict[int, Dict[str, Any]]) -> None:
+        """
+        Apply compositor pad properties (pad index -> properties) as one update.
+        
+        While the pipeline is playing the layout is applied from the mixer's
+        streaming thread right after it pushes a frame, so the next frame is
+        mixed with the whole new layout instead of a half-updated one.
+        """
+        with self._layout_lock:
+            if self.running and self._mixer_src_pad is not None:
+                if self._pending_layout is None:
+                    self._mixer_src_pad.add_probe(Gst.PadProbeType.BUFFER,
+                                                  self._apply_pending_layout)
+                # A newer layout replaces one that has not been applied yet
+                self._pending_layout = layout
+                return
+        self._set_pad_properties(layout)
+    
+    def _apply_pending_layout(self, pad: Gst.Pad, info: Gst.PadProbeInfo) -> int:
+        """One-shot probe on the mixer output that applies the pending layout."""
+        with self._layout_lock:
+            layout, self._pending_layout = self._pending_layout, None
+        if layout:
+            try:
+                self._set_pad_properties(layout)
+            except Exception as e:
+                logger.error(f"Failed to apply view layout: {e}")
+        return Gst.PadProbeReturn.REMOVE
+    
+    def _set_pad_properties(self, layout: Dict[int, Dict[str, Any]]) -> None:
+        """Set the given properties on each compositor sink pad."""
+        for i, properties in layout.items():
+            if i < len(self.compositor_sink_pads):
+                self.compositor_sink_pads[i].set_properties(**properties)
+    
+    def _drop_branch_buffers(self, index: int) -> None:
+        """Drop a hidden camera's frames right after capture so nothing downstream processes them."""
+        if index in self._drop_probes or self.pipeline is None:
+            return
+        queue = self.pipeline.get_by_name(f"srcqueue_{index}")
+        if queue is None:
+            return
+        pad = queue.get_static_pad("src")
+        probe_id = pad.add_probe(Gst.PadProbeType.BUFFER, lambda *_: Gst.PadProbeReturn.DROP)
+        self._drop_probes[index] = (pad, probe_id)
+        # Release the pad's last frame instead of re-compositing it forever
+        self._set_last_buffer_repeat(index, 0)
+    
+    def _resume_branch_buffers(self, index: int) -> None:
+        """Let a camera's frames through again."""
+        entry = self._drop_probes.pop(index, None)
+        if entry is not None:
+            pad, probe_id = entry
+            pad.remove_probe(probe_id)
+            self._set_last_buffer_repeat(index, Gst.CLOCK_TIME_NONE)
+    
+    def _set_last_buffer_repeat(self, index: int, duration: int) -> None:
+        """Set how long a compositor pad keeps repeating its last frame (GStreamer >= 1.18)."""
+        if index < len(self.compositor_sink_pads) and self._pads_repeat_last_buffer:
+            self.compositor_sink_pads[index].set_property("max-last-buffer-repeat", duration)
+    
     def _setup_fps_measurement(self, caps_element: Gst.Element, camera_index: int) -> None:
         """Set up FPS measurement using pad probe on caps element output."""
         try:
@@ -401,7 +1138,7 @@ class GStreamerManager:
                         # Update text overlay
                         self._update_fps_display(camera_index)
         except Exception as e:
-            logger.debug(f"Error in FPS probe callback for camera {camera_index}: {e}")
+            logger.debug("Error in FPS probe callback for camera %d: %s", camera_index, e)
         
         return Gst.PadProbeReturn.OK
     
@@ -425,7 +1162,7 @@ class GStreamerManager:
             textoverlay.set_property("text", display_text)
             
         except Exception as e:
-            logger.debug(f"Error updating FPS display for camera {camera_index}: {e}")
+            logger.debug("Error updating FPS display for camera %d: %s", camera_index, e)
     
     def show_fps_overlay(self) -> None:
         """Show FPS overlay on all cameras."""
@@ -462,7 +1199,7 @@ class GStreamerManager:
                 self.fps_hide_timer.cancel()
                 self.fps_hide_timer = None
         except Exception as e:
-            logger.debug(f"Error canceling hide timer: {e}")
+            logger.debug("Error canceling hide timer: %s", e)
     
     def _schedule_hide_overlay(self) -> None:
         """Schedule hiding the overlay after idle timeout."""
@@ -474,7 +1211,7 @@ class GStreamerManager:
             self.fps_hide_timer = Timer(self.fps_idle_timeout, self.hide_fps_overlay)
             self.fps_hide_timer.daemon = True  # Allow program to exit even if timer is running
             self.fps_hide_timer.start()
-            logger.debug(f"Scheduled FPS overlay hide after {self.fps_idle_timeout} seconds")
+            logger.debug("Scheduled FPS overlay hide after %s seconds", self.fps_idle_timeout)
         except Exception as e:
             logger.error(f"Error scheduling hide timer: {e}")
     
@@ -488,52 +1225,6 @@ class GStreamerManager:
         except Exception as e:
             logger.error(f"Error handling mouse activity: {e}")
     
-    def _create_video_sink(self, window_id: Optional[int] = None) -> Gst.Element:
-        """Create the video sink element."""
-        try:
-            # Create videoconvert for final output
-            convert = Gst.ElementFactory.make("videoconvert", "final_convert")
-            if convert is None:
-                raise Exception("Could not create videoconvert")
-            
-            # Create X11 video sink (xvimagesink for best performance)
-            sink = Gst.ElementFactory.make("xvimagesink", "video_sink")
-            if sink is None:
-                # Fallback to ximagesink
-                sink = Gst.ElementFactory.make("ximagesink", "video_sink")
-                if sink is None:
-                    raise Exception("Could not create any X11 video sink")
-                logger.info("Created ximagesink for window embedding")
-            else:
-                logger.info("Created xvimagesink for window embedding")
-            
-            # Configure sink for low latency
-            try:
-                # Disable sync to clock for real-time display (reduces buffering)
-                sink.set_property("sync", False)
-                # Drop late frames instead of queuing them
-                sink.set_property("max-lateness", -1)
-                sink.set_property("drop-on-lateness", True)
-                logger.debug("Configured sink for low latency (VSYNC disabled)")
-            except Exception as e:
-                logger.debug(f"Could not set all latency properties: {e}")
-            
-            # Store window ID for later setting
-            self.window_id = window_id
-            
-            # Add to pipeline and link
-            self.pipeline.add(convert)
-            self.pipeline.add(sink)
-            convert.link(sink)
-            
-            logger.info(f"Created video sink (window_id: {window_id})")
-            return convert
-            
-        except Exception as e:
-            logger.error(f"Failed to create video sink: {e}")
-            raise
-    
-    
     def start_pipeline(self) -> bool:
         """Start the GStreamer pipeline."""
         try:
@@ -541,63 +1232,61 @@ class GStreamerManager:
                 logger.error("No pipeline created")
                 return False
             
-            ret = self.pipeline.set_state(Gst.State.PLAYING)
-            if ret == Gst.StateChangeReturn.FAILURE:
-                logger.error("Failed to start pipeline")
-                return False
-            
-            # Set window ID after pipeline starts playing (correct way for X11 embedding)
-            if hasattr(self, 'window_id') and self.window_id is not None:
-                self._set_window_id_after_start()
-            
-            self.running = True
-            logger.info("GStreamer pipeline started")
-            return True
+            # The state change runs on the GStreamer thread; wait for its result
+            self._pipeline_null = False
+            ret = self._invoke_sync(self._play_pipeline, self.pipeline)
+            return ret is not None and ret != Gst.StateChangeReturn.FAILURE
             
         except Exception as e:
             logger.error(f"Failed to start pipeline: {e}")
             return False
     
-    def _set_window_id_after_start(self) -> None:
-        """Set window ID after pipeline starts playing."""
+    def _play_pipeline(self, pipeline: Gst.Pipeline) -> Gst.StateChangeReturn:
+        """Set the pipeline to PLAYING (runs on the GStreamer thread)."""
         try:
-            sink_element = self.pipeline.get_by_name("video_sink")
-            if sink_element is None:
-                logger.warning("Could not find video sink element")
-                return
+            if pipeline is not self.pipeline:
+                # Destroyed or replaced before we got to it
+                return Gst.StateChangeReturn.FAILURE
             
-            # Use VideoOverlay interface (standard way for X11 embedding)
-            try:
-                # Try to use VideoOverlay interface (xvimagesink implements this)
-                overlay = GstVideo.VideoOverlay.cast(sink_element)
-                overlay.set_window_handle(self.window_id)
-                logger.info(f"Set window handle to {self.window_id} using VideoOverlay interface")
-                return
-            except (AttributeError, TypeError, Exception) as e:
-                logger.debug(f"Could not use VideoOverlay interface: {e}")
+            # Open devices and the sink (which asks for the window handle) in
+            # PAUSED first, so the first frame goes straight to our window
+            ret = pipeline.set_state(Gst.State.PAUSED)
+            if ret == Gst.StateChangeReturn.ASYNC:
+                ret, _, _ = pipeline.get_state(_PREROLL_TIMEOUT)
+            if ret == Gst.StateChangeReturn.FAILURE:
+                logger.error("Failed to pre-roll pipeline")
+                return ret
             
-            # Fallback: Try direct method call (some sinks implement this directly)
-            try:
-                if hasattr(sink_element, 'set_window_handle'):
-                    sink_element.set_window_handle(self.window_id)
-                    logger.info(f"Set window handle to {self.window_id} using direct method")
-                    return
-            except Exception as e:
-                logger.debug(f"Could not set window handle directly: {e}")
+            ret = pipeline.set_state(Gst.State.PLAYING)
+            if ret == Gst.StateChangeReturn.FAILURE:
+                logger.error("Failed to start pipeline")
+                return ret
             
-            # Fallback: Property setting
-            window_properties = ["window-id", "xid", "xwindow-id", "window"]
-            for prop_name in window_properties:
-                try:
-                    sink_element.set_property(prop_name, self.window_id)
-                    logger.info(f"Set {prop_name} to {self.window_id}")
-                    return
-                except Exception as e:
-                    logger.debug(f"Could not set {prop_name}: {e}")
-                    continue
+            self.running = True
+            logger.info("GStreamer pipeline started")
+            return ret
             
-            logger.warning("Could not set window ID for embedding")
-                
+        except Exception as e:
+            logger.error(f"Failed to start pipeline: {e}")
+            return Gst.StateChangeReturn.FAILURE
+    
+    def _on_sync_message(self, bus: Gst.Bus, message: Gst.Message) -> None:
+        """
+        Embed the video in our window when the sink prepares its window handle.
+        
+        Called synchronously from the sink's streaming thread, so the handle is
+        in place before the sink would otherwise open a window of its own.
+        """
+        if self.window_id is None or not message.has_name("prepare-window-handle"):
+            return
+        
+        # GstVideo is only needed here, so its typelib loads on first use
+        from gi.repository import GstVideo
+        
+        # All sinks we build (xvimagesink, ximagesink, glimagesink) implement VideoOverlay
+        try:
+            GstVideo.VideoOverlay.set_window_handle(message.src, self.window_id)
+            logger.info(f"Set window handle to {self.window_id} using VideoOverlay interface")
         except Exception as e:
             logger.error(f"Failed to set window ID: {e}")
     
@@ -605,8 +1294,17 @@ class GStreamerManager:
         """Stop the GStreamer pipeline."""
         try:
             if self.pipeline is not None:
-                self.pipeline.set_state(Gst.State.NULL)
+                # Wait for the NULL transition so callers can release resources after
+                self._invoke_sync(self.pipeline.set_state, Gst.State.NULL)
+                self._pipeline_null = True
+                # Bus messages are flushed on NULL, so no state-changed will report it
+                self._last_state = Gst.State.NULL
                 self.running = False
+                # No more frames will apply a pending layout, so apply it now
+                with self._layout_lock:
+                    layout, self._pending_layout = self._pending_layout, None
+                if layout:
+                    self._set_pad_properties(layout)
                 logger.info("GStreamer pipeline stopped")
         except Exception as e:
             logger.error(f"Failed to stop pipeline: {e}")
@@ -615,18 +1313,46 @@ class GStreamerManager:
         """Destroy the GStreamer pipeline."""
         try:
             if self.pipeline is not None:
-                self.stop_pipeline()
+                # Skip the (blocking) NULL transition if stop_pipeline() already did it
+                if not self._pipeline_null:
+                    self.stop_pipeline()
+                if self._bus is not None:
+                    for handler_id in self._bus_handler_ids:
+                        self._bus.disconnect(handler_id)
+                    self._bus_handler_ids = []
+                    self._bus.remove_signal_watch()
+                    self._bus.disable_sync_message_emission()
+                    self._bus = None
+                # The mixer's sink_%u pads are request pads; hand them back
+                # now that nothing streams into them
+                self._invoke_sync(self._release_mixer_pads, self.pipeline)
                 self.pipeline = None
+                self._sink_element = None
+                self._mixer_src_pad = None
+                self._pending_layout = None
+                # Drop our references to the overlays so the pipeline is freed now
+                self._drop_probes = {}
+                self._view_layouts = {}
+                self.fps_overlays = {}
+                self._branch_elements = {}
+                self._branch_index = {}
                 logger.info("GStreamer pipeline destroyed")
         except Exception as e:
             logger.error(f"Failed to destroy pipeline: {e}")
     
+    def _release_mixer_pads(self, pipeline: Gst.Pipeline) -> None:
+        """Release the mixer's sink_%u request pads (runs on the GStreamer thread)."""
+        mixer = pipeline.get_by_name("comp")
+        if mixer is not None:
+            for pad in self.compositor_sink_pads:
+                mixer.release_request_pad(pad)
+        self.compositor_sink_pads = []
+    
     def get_pipeline_state(self) -> Optional[str]:
-        """Get the current pipeline state."""
+        """Get the current pipeline state (as last reported on the bus, no state query)."""
         try:
             if self.pipeline is not None:
-                state = self.pipeline.get_state(0)[1]
-                return Gst.Element.state_get_name(state)
+                return Gst.Element.state_get_name(self._last_state)
         except Exception as e:
             logger.error(f"Failed to get pipeline state: {e}")
         return None
@@ -641,6 +1367,15 @@ class GStreamerManager:
             # Cancel any pending timers
             self._cancel_hide_timer()
             self.destroy_pipeline()
+            
+            # Stop the GStreamer thread
+            if self._loop is not None:
+                self._loop.quit()
+            if self._gst_thread is not None and self._gst_thread is not current_thread():
+                self._gst_thread.join(timeout=1.0)
+            self._loop = None
+            self._gst_thread = None
+            
             logger.info("GStreamer manager closed")
         except Exception as e:
             logger.error(f"Error closing GStreamer manager: {e}")
@@ -7,6 +7,7 @@ Handles X11 window creation, management, and event handling.
 """
 
 import logging
+import selectors
 from typing import Optional, Tuple, Callable, Dict, Any
 from Xlib import X, XK, display
 from Xlib.protocol import request
@@ -24,21 +25,28 @@ class X11WindowManager:
     X11 windows with proper event handling and cleanup.
     """
     
-    def __init__(self, display_name: Optional[str] = None):
+    def __init__(self, display_name: Optional[str] = None,
+                 dpy: Optional[display.Display] = None):
         """
         Initialize the X11 Window Manager.
         
         Args:
             display_name: X11 display name (e.g., ":0.0")
+            dpy: Existing display connection to share instead of opening
+                a new one (the caller stays responsible for closing it)
         """
         self.display_name = display_name
-        self.dpy: Optional[display.Display] = None
+        self.dpy: Optional[display.Display] = dpy
+        self._owns_display = dpy is None
         self.screen: Optional[Any] = None
         self.root: Optional[drawable.Window] = None
         self.window: Optional[drawable.Window] = None
         self.gc: Optional[Any] = None
         self.running = False
         
+        # Interned WM_DELETE_WINDOW atom (set when the window is created)
+        self.wm_delete_window_atom: Optional[int] = None
+        
         # Window properties
         self.window_width = 3840
         self.window_height = 2160
@@ -48,13 +56,27 @@ class X11WindowManager:
         # Event handlers
         self.event_handlers: Dict[int, Callable] = {}
         
+        # Built-in handlers, run after any registered handler for the same type
+        self._builtin_handlers: Dict[int, Callable] = {
+            X.Expose: self._handle_expose,
+            X.KeyPress: self._handle_key_press,
+            X.ButtonPress: self._handle_button_press,
+            X.EnterNotify: self._handle_enter_notify,
+            X.LeaveNotify: self._handle_leave_notify,
+            X.ClientMessage: self._handle_client_message,
+        }
+        
+        # Maximum time the event loop sleeps before re-checking self.running
+        self.event_poll_interval = 0.1
+        
         # Initialize display
         self._init_display()
         
     def _init_display(self) -> None:
         """Initialize X11 display connection."""
         try:
-            self.dpy = display.Display(self.display_name)
+            if self.dpy is None:
+                self.dpy = display.Display(self.display_name)
             self.screen = self.dpy.screen()
             self.root = self.screen.root
             
@@ -146,8 +168,8 @@ class X11WindowManager:
             # Set up window manager protocol
             try:
                 # Set WM_DELETE_WINDOW protocol for proper window closing
-                wm_delete_window = self.dpy.intern_atom("WM_DELETE_WINDOW")
-                self.window.set_wm_protocols([wm_delete_window])
+                self.wm_delete_window_atom = self.dpy.intern_atom("WM_DELETE_WINDOW")
+                self.window.set_wm_protocols([self.wm_delete_window_atom])
                 
                 # Set window state
                 wm_state = self.dpy.intern_atom("WM_STATE")
@@ -276,28 +298,23 @@ class X11WindowManager:
             return
         
         try:
-            while self.dpy.pending_events():
-                event = self.dpy.next_event()
-                
-                # Call registered event handler
-                if event.type in self.event_handlers:
-                    self.event_handlers[event.type](event)
+            # Drain everything already queued per pending_events() call
+            count = self.dpy.pending_events()
+            while count:
+                for _ in range(count):
+                    event = self.dpy.next_event()
+                    
+                    # Call registered event handler
+                    handler = self.event_handlers.get(event.type)
+                    if handler is not None:
+                        handler(event)
+                    
+                    # Handle common events
+                    builtin = self._builtin_handlers.get(event.type)
+                    if builtin is not None:
+                        builtin(event)
                 
-                # Handle common events
-                if event.type == X.Expose:
-                    self._handle_expose(event)
-                elif event.type == X.KeyPress:
-                    self._handle_key_press(event)
-                elif event.type == X.ButtonPress:
-                    self._handle_button_press(event)
-                elif event.type == X.MotionNotify:
-                    self._handle_motion_notify(event)
-                elif event.type == X.EnterNotify:
-                    self._handle_enter_notify(event)
-                elif event.type == X.LeaveNotify:
-                    self._handle_leave_notify(event)
-                elif event.type == X.ClientMessage:
-                    self._handle_client_message(event)
+                count = self.dpy.pending_events()
                     
         except Exception as e:
             logger.error(f"Error handling events: {e}")
@@ -352,30 +369,19 @@ class X11WindowManager:
         logger.info(f"Right click at ({x}, {y})")
         # Implement exit logic here
     
-    def _handle_motion_notify(self, event) -> None:
-        """Handle mouse motion events."""
-        # Call registered handler if exists
-        if X.MotionNotify in self.event_handlers:
-            self.event_handlers[X.MotionNotify](event)
-    
     def _handle_enter_notify(self, event) -> None:
         """Handle mouse enter window events."""
         logger.debug("Mouse entered window")
-        # Call registered handler if exists
-        if X.EnterNotify in self.event_handlers:
-            self.event_handlers[X.EnterNotify](event)
     
     def _handle_leave_notify(self, event) -> None:
         """Handle mouse leave window events."""
         logger.debug("Mouse left window")
-        # Call registered handler if exists
-        if X.LeaveNotify in self.event_handlers:
-            self.event_handlers[X.LeaveNotify](event)
     
     def _handle_client_message(self, event) -> None:
         """Handle client message events (e.g., window close)."""
         logger.debug("Client message received")
-        if event.data[0] == self.dpy.intern_atom("WM_DELETE_WINDOW").atom:
+        _, data = event.data
+        if self.wm_delete_window_atom is not None and data[0] == self.wm_delete_window_atom:
             logger.info("Window close requested")
             self.running = False
     
@@ -388,25 +394,28 @@ class X11WindowManager:
         self.running = True
         logger.info("Starting X11 event loop...")
         
+        selector = selectors.DefaultSelector()
         try:
-            sync_counter = 0
+            # Sleep in select() on the X connection instead of spinning on
+            # pending_events()
+            selector.register(self.dpy.fileno(), selectors.EVENT_READ)
+            
             while self.running:
+                # Drain events Xlib has already buffered before blocking
                 self.handle_events()
                 self.dpy.flush()
                 
-                # Sync only occasionally to reduce latency (every 10 iterations)
-                # flush() sends requests immediately, sync() waits for replies
-                # For low latency, we don't need to wait for X server replies every iteration
-                sync_counter += 1
-                if sync_counter >= 10:
-                    self.dpy.sync()
-                    sync_counter = 0
+                if not self.running:
+                    break
+                
+                selector.select(timeout=self.event_poll_interval)
                 
         except KeyboardInterrupt:
             logger.info("Event loop interrupted by user")
         except Exception as e:
             logger.error(f"Error in event loop: {e}")
         finally:
+            selector.close()
             self.running = False
             logger.info("Event loop ended")
     
@@ -417,7 +426,9 @@ class X11WindowManager:
             self.destroy_window()
             
             if self.dpy is not None:
-                self.dpy.close()
+                # A shared connection is closed by whoever opened it
+                if self._owns_display:
+                    self.dpy.close()
                 self.dpy = None
             
             logger.info("X11 connection closed")
@@ -11,6 +11,7 @@ import sys
 import argparse
 import signal
 import logging
+from functools import lru_cache
 from typing import Dict, Any
 
 from .ui.main_window import MainWindow
@@ -19,13 +20,9 @@ from .utils.logger import setup_logging, get_logger
 
 logger = get_logger(__name__)
 
+_VERSION = "X11 GStreamer Viewer 1.0.0"
 
-def parse_arguments() -> argparse.Namespace:
-    """Parse command line arguments."""
-    parser = argparse.ArgumentParser(
-        description="X11 GStreamer Viewer - 4-Way Video Display",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+_EPILOG = """
 Examples:
   %(prog)s                          # Run with default settings
   %(prog)s --width 1920 --height 1080  # Custom window size
@@ -35,6 +32,15 @@ Examples:
 Controls:
   Escape/Q       Exit application
         """
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser (constructed once and reused)."""
+    parser = argparse.ArgumentParser(
+        description="X11 GStreamer Viewer - 4-Way Video Display",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG
     )
     
     # Window options
@@ -99,6 +105,12 @@ Controls:
         default=2160,
         help="Output video height (default: 2160)"
     )
+    parser.add_argument(
+        "--pin-threads",
+        action="store_true",
+        default=None,
+        help="Pin each camera's streaming threads to its own CPU"
+    )
     
     # Logging options
     parser.add_argument(
@@ -140,10 +152,15 @@ Controls:
     parser.add_argument(
         "--version", "-v",
         action="version",
-        version="X11 GStreamer Viewer 1.0.0"
+        version=_VERSION
     )
     
-    return parser.parse_args()
+    return parser
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    return _build_parser().parse_args()
 
 
 def setup_signal_handlers(main_window: MainWindow) -> None:
@@ -187,6 +204,7 @@ def main() -> int:
         # Set up logging
         setup_logging(
             level=config.logging.level,
+            format_str=config.logging.format,
             log_file=config.logging.file,
             console=config.logging.console
         )
@@ -205,7 +223,8 @@ def main() -> int:
         # Create main window
         main_window = MainWindow(
             width=config.window.width,
-            height=config.window.height
+            height=config.window.height,
+            pin_threads=config.video.pin_threads
         )
         
         # Set up signal handlers
@@ -8,13 +8,20 @@ with GStreamer video pipeline.
 """
 
 import logging
-from typing import Optional, Callable, Dict, Any
+from typing import TYPE_CHECKING, Optional, Callable, Dict, Any
+
+from Xlib import X, XK
 
 from ..core.x11_manager import X11WindowManager
-from ..core.gstreamer_manager import GStreamerManager
+
+if TYPE_CHECKING:
+    from ..core.gstreamer_manager import GStreamerManager
 
 logger = logging.getLogger(__name__)
 
+# Keys that exit the application
+_EXIT_KEYSYMS = frozenset((XK.XK_Escape, XK.XK_q))
+
 
 class MainWindow:
     """
@@ -23,27 +30,36 @@ class MainWindow:
     Simple and clean implementation following KISS principle.
     """
     
-    def __init__(self, width: int = 3840, height: int = 2160):
+    def __init__(self, width: int = 3840, height: int = 2160, pin_threads: bool = False):
         """
         Initialize the main window.
         
         Args:
             width: Window width in pixels
             height: Window height in pixels
+            pin_threads: Pin each camera's streaming threads to its own CPU
         """
         self.width = width
         self.height = height
+        self.pin_threads = pin_threads
         
         # Initialize managers
         self.x11_manager: Optional[X11WindowManager] = None
-        self.gstreamer_manager: Optional[GStreamerManager] = None
+        self._gstreamer_manager: Optional["GStreamerManager"] = None
         
         # Application state
         self.running = False
+        self._stopped = False
         
         # Event handlers
         self.event_handlers: Dict[str, Callable] = {}
         
+        # Cached WM_DELETE_WINDOW atom (avoids an X round-trip per ClientMessage)
+        self._wm_delete_atom: Optional[int] = None
+        
+        # Keycode -> unshifted keysym, built once at window creation
+        self._keycode_map: Dict[int, int] = {}
+        
         
         # Initialize components
         self._init_components()
@@ -51,12 +67,9 @@ class MainWindow:
     def _init_components(self) -> None:
         """Initialize X11 and GStreamer components."""
         try:
-            # Initialize X11 manager
+            # Initialize X11 manager (GStreamer manager is created on first use)
             self.x11_manager = X11WindowManager()
             
-            # Initialize GStreamer manager
-            self.gstreamer_manager = GStreamerManager()
-            
             # Set up event handlers
             self._setup_event_handlers()
             
@@ -66,14 +79,29 @@ class MainWindow:
             logger.error(f"Failed to initialize components: {e}")
             raise
     
+    @property
+    def gstreamer_manager(self) -> "GStreamerManager":
+        """
+        GStreamer manager, created on first access.
+        
+        GStreamer is imported lazily so that paths which never build a
+        pipeline do not pay the GObject/GStreamer import cost.
+        """
+        if self._gstreamer_manager is None:
+            from ..core.gstreamer_manager import GStreamerManager
+            self._gstreamer_manager = GStreamerManager()
+        return self._gstreamer_manager
+    
+    @gstreamer_manager.setter
+    def gstreamer_manager(self, manager: Optional["GStreamerManager"]) -> None:
+        """Set (or clear) the GStreamer manager."""
+        self._gstreamer_manager = manager
+    
     def _setup_event_handlers(self) -> None:
         """Set up event handlers for user interactions."""
         if self.x11_manager is None:
             return
         
-        # Set up X11 event handlers
-        from Xlib import X
-        
         # Key press handler
         self.x11_manager.set_event_handler(X.KeyPress, self._handle_key_press)
         
@@ -83,6 +111,9 @@ class MainWindow:
         # Mouse motion handler (for FPS overlay visibility on mouse activity)
         self.x11_manager.set_event_handler(X.MotionNotify, self._handle_mouse_motion)
         
+        # Resize handler (composite at the new window size)
+        self.x11_manager.set_event_handler(X.ConfigureNotify, self._handle_configure_notify)
+        
         # Client message handler (window close)
         self.x11_manager.set_event_handler(X.ClientMessage, self._handle_client_message)
         
@@ -103,19 +134,11 @@ class MainWindow:
                 logger.error("X11 manager not initialized")
                 return False
             
-            # Validate window size matches compositor output size
-            # Compositor creates 2x2 grid: width = video_width * 2, height = video_height * 2
-            expected_width = self.gstreamer_manager.video_width * 2
-            expected_height = self.gstreamer_manager.video_height * 2
+            # Composite at the window size, so no pixels are mixed only to be
+            # scaled away by the sink
+            self.gstreamer_manager.output_size = (self.width, self.height)
             
-            if self.width != expected_width or self.height != expected_height:
-                logger.warning(
-                    f"Window size ({self.width}x{self.height}) doesn't match compositor output "
-                    f"({expected_width}x{expected_height}). Video may not display correctly."
-                )
-                logger.info(f"Adjusting window size to match compositor output")
-                self.width = expected_width
-                self.height = expected_height
+            self.gstreamer_manager.pin_branch_threads = self.pin_threads
             
             # Create X11 window
             if not self.x11_manager.create_window(
@@ -126,6 +149,14 @@ class MainWindow:
                 logger.error("Failed to create X11 window")
                 return False
             
+            # Cache the window close atom for the client message handler
+            self._wm_delete_atom = self.x11_manager.wm_delete_window_atom
+            if self._wm_delete_atom is None:
+                self._wm_delete_atom = self.x11_manager.dpy.intern_atom("WM_DELETE_WINDOW")
+            
+            # Resolve the keyboard mapping once for the key press handler
+            self._build_keycode_map()
+            
             # Get window ID for GStreamer
             window_id = self.x11_manager.get_window_id()
             if window_id is None:
@@ -144,6 +175,16 @@ class MainWindow:
             logger.error(f"Failed to create main window: {e}")
             return False
     
+    def _build_keycode_map(self) -> None:
+        """Build the keycode -> keysym map used by the key press handler."""
+        dpy = self.x11_manager.dpy
+        min_keycode = dpy.display.info.min_keycode
+        max_keycode = dpy.display.info.max_keycode
+        self._keycode_map = {
+            keycode: dpy.keycode_to_keysym(keycode, 0)
+            for keycode in range(min_keycode, max_keycode + 1)
+        }
+    
     def start(self) -> bool:
         """
         Start the main window and video pipeline.
@@ -152,7 +193,7 @@ class MainWindow:
             True if started successfully, False otherwise
         """
         try:
-            if self.gstreamer_manager is None:
+            if self._gstreamer_manager is None:
                 logger.error("GStreamer manager not initialized")
                 return False
             
@@ -163,6 +204,7 @@ class MainWindow:
             
             
             self.running = True
+            self._stopped = False
             logger.info("Main window started successfully")
             return True
             
@@ -172,13 +214,17 @@ class MainWindow:
     
     def stop(self) -> None:
         """Stop the main window and cleanup resources."""
+        # Signal handler and __exit__ can both get here; stop only once
+        if self._stopped:
+            return
+        
         try:
             self.running = False
+            self._stopped = True
             
             # Stop GStreamer pipeline
-            if self.gstreamer_manager is not None:
-                self.gstreamer_manager.stop_pipeline()
-            
+            if self._gstreamer_manager is not None:
+                self._gstreamer_manager.stop_pipeline()
             
             logger.info("Main window stopped")
             
@@ -211,14 +257,17 @@ class MainWindow:
     def _handle_key_press(self, event) -> None:
         """Handle key press events."""
         try:
-            keysym = self.x11_manager.dpy.keycode_to_keysym(event.detail, 0)
-            from Xlib import XK
+            if self.x11_manager is None:
+                return
+            
+            keysym = self._keycode_map.get(event.detail)
+            if keysym is None:
+                keysym = self.x11_manager.dpy.keycode_to_keysym(event.detail, 0)
             
-            if keysym == XK.XK_Escape or keysym == XK.XK_q:
+            if keysym in _EXIT_KEYSYMS:
                 logger.info("Exit key pressed")
                 self.running = False
-                if self.x11_manager is not None:
-                    self.x11_manager.running = False
+                self.x11_manager.running = False
                 
         except Exception as e:
             logger.error(f"Error handling key press: {e}")
@@ -227,19 +276,27 @@ class MainWindow:
         """Handle mouse button press events."""
         button = event.detail
         if button == 1:  # Left click
-            if self.gstreamer_manager is not None:
-                self.gstreamer_manager.cycle_view()
+            if self._gstreamer_manager is not None:
+                self._gstreamer_manager.cycle_view()
     
     def _handle_mouse_motion(self, event) -> None:
         """Handle mouse motion events - show overlay and reset idle timer."""
-        if self.gstreamer_manager is not None:
-            self.gstreamer_manager.on_mouse_activity()
+        if self._gstreamer_manager is not None:
+            self._gstreamer_manager.on_mouse_activity()
+    
+    def _handle_configure_notify(self, event) -> None:
+        """Handle window resizes - composite at the new window size."""
+        if (event.width, event.height) == (self.width, self.height):
+            return
+        self.width, self.height = event.width, event.height
+        if self._gstreamer_manager is not None:
+            self._gstreamer_manager.set_output_size(event.width, event.height)
     
     def _handle_client_message(self, event) -> None:
         """Handle client message events (window close)."""
         try:
-            if (self.x11_manager is not None and 
-                event.data[0] == self.x11_manager.dpy.intern_atom("WM_DELETE_WINDOW").atom):
+            _, data = event.data
+            if self._wm_delete_atom is not None and data[0] == self._wm_delete_atom:
                 logger.info("Window close requested")
                 self.running = False
                 if self.x11_manager is not None:
@@ -259,8 +316,8 @@ class MainWindow:
             if self.x11_manager is not None:
                 status["window_geometry"] = self.x11_manager.get_window_geometry()
             
-            if self.gstreamer_manager is not None:
-                status["pipeline_state"] = self.gstreamer_manager.get_pipeline_state()
+            if self._gstreamer_manager is not None:
+                status["pipeline_state"] = self._gstreamer_manager.get_pipeline_state()
                 
         except Exception as e:
             logger.error(f"Error getting status: {e}")
@@ -272,9 +329,9 @@ class MainWindow:
         try:
             self.stop()
             
-            if self.gstreamer_manager is not None:
-                self.gstreamer_manager.close()
-                self.gstreamer_manager = None
+            if self._gstreamer_manager is not None:
+                self._gstreamer_manager.close()
+                self._gstreamer_manager = None
             
             if self.x11_manager is not None:
                 self.x11_manager.close()
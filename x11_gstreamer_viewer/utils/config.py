@@ -7,12 +7,37 @@ Handles application configuration and settings.
 """
 
 import os
+import sys
 import json
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+import operator
+from typing import IO, Any, Callable, Dict, Optional, Set, Tuple, Union
+from dataclasses import dataclass, asdict, fields
 
+# orjson is optional; it parses config files noticeably faster than json
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
-@dataclass
+# Slotted dataclasses need Python 3.10+; older interpreters keep __dict__
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+_VALID_LOG_LEVELS = frozenset(('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'))
+
+# Config directories already created by save()
+_MKDIR_CACHE: Set[str] = set()
+
+# Parsed config files shared across Config instances:
+# path -> ((st_ino, st_mtime_ns, st_size), parsed data)
+_CONFIG_CACHE: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+
+
+def _shallow_dict(section: Any) -> Dict[str, Any]:
+    """Field name -> value for a config dataclass, without asdict()'s deep copy."""
+    return {field.name: getattr(section, field.name) for field in fields(section)}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class VideoConfig:
     """Video configuration settings."""
     width: int = 1920
@@ -20,13 +45,17 @@ class VideoConfig:
     output_width: int = 3840
     output_height: int = 2160
     devices: list = None
+    pin_threads: bool = False
     
     def __post_init__(self):
         if self.devices is None:
             self.devices = ["/dev/video0", "/dev/video1", "/dev/video2", "/dev/video3"]
+        else:
+            # Own copy, so cached config data is never mutated through it
+            self.devices = list(self.devices)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class WindowConfig:
     """Window configuration settings."""
     width: int = 3840
@@ -37,7 +66,7 @@ class WindowConfig:
     fullscreen: bool = False
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class LoggingConfig:
     """Logging configuration settings."""
     level: str = "INFO"
@@ -54,30 +83,66 @@ class Config:
     from various sources (file, environment, defaults).
     """
     
-    def __init__(self, config_file: Optional[str] = None):
+    # Command line argument -> (config section, attribute, value transform)
+    _ARG_MAP: Dict[str, Tuple[str, str, Optional[Callable[[Any], Any]]]] = {
+        'video_width': ('video', 'width', None),
+        'video_height': ('video', 'height', None),
+        'output_width': ('video', 'output_width', None),
+        'output_height': ('video', 'output_height', None),
+        'pin_threads': ('video', 'pin_threads', None),
+        'width': ('window', 'width', None),
+        'height': ('window', 'height', None),
+        'x': ('window', 'x', None),
+        'y': ('window', 'y', None),
+        'title': ('window', 'title', None),
+        'fullscreen': ('window', 'fullscreen', None),
+        'log_level': ('logging', 'level', None),
+        'log_file': ('logging', 'file', None),
+        'no_console_log': ('logging', 'console', operator.not_),
+    }
+    
+    def __init__(self, config_file: Union[str, IO, None] = None):
         """
         Initialize configuration manager.
         
         Args:
-            config_file: Path to configuration file
+            config_file: Path to configuration file, or an open file-like
+                object to read the configuration from (save() then needs
+                config_file set to a path)
         """
-        self.config_file = config_file or os.path.expanduser("~/.config/x11-gstreamer-viewer/config.json")
+        self._config_stream: Optional[IO] = None
+        if config_file is not None and hasattr(config_file, 'read'):
+            self._config_stream = config_file
+            self.config_file = getattr(config_file, 'name', None)
+        else:
+            self.config_file = config_file or os.path.expanduser("~/.config/x11-gstreamer-viewer/config.json")
         
         # Default configuration
         self.video = VideoConfig()
         self.window = WindowConfig()
         self.logging = LoggingConfig()
         
+        # Last validate() result: (validated field values, result)
+        self._validation_cache: Optional[Tuple[tuple, bool]] = None
+        
         # Load configuration
         self.load()
     
     def load(self) -> None:
         """Load configuration from file."""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    data = json.load(f)
-                
+            if self._config_stream is not None:
+                # File-like source: consumed once
+                data = _json_loads(self._config_stream.read())
+                self._config_stream = None
+                source = self.config_file or "stream"
+            elif self.config_file is not None:
+                data = self._read_config_file()
+                source = self.config_file
+            else:
+                data = None
+            
+            if data is not None:
                 # Update configurations
                 if 'video' in data:
                     self.video = VideoConfig(**data['video'])
@@ -88,7 +153,7 @@ class Config:
                 if 'logging' in data:
                     self.logging = LoggingConfig(**data['logging'])
                 
-                print(f"Configuration loaded from {self.config_file}")
+                print(f"Configuration loaded from {source}")
             else:
                 print(f"Configuration file not found, using defaults")
                 
@@ -96,11 +161,42 @@ class Config:
             print(f"Error loading configuration: {e}")
             print("Using default configuration")
     
+    def _read_config_file(self) -> Optional[Dict[str, Any]]:
+        """
+        Read and parse the config file, reusing a cached parse if unchanged.
+        
+        Returns:
+            Parsed configuration data, or None if the file does not exist
+        """
+        try:
+            f = open(self.config_file, 'rb')
+        except FileNotFoundError:
+            return None
+        
+        with f:
+            st = os.fstat(f.fileno())
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            cached = _CONFIG_CACHE.get(self.config_file)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            
+            data = _json_loads(f.read())
+        
+        _CONFIG_CACHE[self.config_file] = (stamp, data)
+        return data
+    
     def save(self) -> None:
         """Save configuration to file."""
+        if self.config_file is None:
+            print("Error saving configuration: no configuration file path set")
+            return
+        
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
+            # Create directory if it doesn't exist (once per process)
+            config_dir = os.path.dirname(self.config_file)
+            if config_dir and config_dir not in _MKDIR_CACHE:
+                os.makedirs(config_dir, exist_ok=True)
+                _MKDIR_CACHE.add(config_dir)
             
             # Prepare data
             data = {
@@ -109,9 +205,13 @@ class Config:
                 'logging': asdict(self.logging),
             }
             
-            # Save to file
+            # Serialize once and hand the file a single write
+            payload = json.dumps(data, indent=2)
             with open(self.config_file, 'w') as f:
-                json.dump(data, f, indent=2)
+                f.write(payload)
+            
+            # Drop the cached parse; the next load re-reads the new file
+            _CONFIG_CACHE.pop(self.config_file, None)
             
             print(f"Configuration saved to {self.config_file}")
             
@@ -137,48 +237,48 @@ class Config:
         """
         Update configuration from command line arguments.
         
+        Arguments that are None (not given and without a default) keep
+        the value from the configuration file.
+        
         Args:
             args: Dictionary of command line arguments
         """
-        # Update video config
-        if 'video_width' in args:
-            self.video.width = args['video_width']
-        if 'video_height' in args:
-            self.video.height = args['video_height']
-        if 'output_width' in args:
-            self.video.output_width = args['output_width']
-        if 'output_height' in args:
-            self.video.output_height = args['output_height']
-        
-        # Update window config
-        if 'window_width' in args:
-            self.window.width = args['window_width']
-        if 'window_height' in args:
-            self.window.height = args['window_height']
-        if 'window_x' in args:
-            self.window.x = args['window_x']
-        if 'window_y' in args:
-            self.window.y = args['window_y']
-        if 'title' in args:
-            self.window.title = args['title']
-        if 'fullscreen' in args:
-            self.window.fullscreen = args['fullscreen']
-        
-        # Update logging config
-        if 'log_level' in args:
-            self.logging.level = args['log_level']
-        if 'log_file' in args:
-            self.logging.file = args['log_file']
-        if 'no_console_log' in args:
-            self.logging.console = not args['no_console_log']
+        for key, value in args.items():
+            spec = self._ARG_MAP.get(key)
+            if spec is None or value is None:
+                continue
+            
+            section, attr, transform = spec
+            if transform is not None:
+                value = transform(value)
+            setattr(getattr(self, section), attr, value)
     
     def validate(self) -> bool:
         """
         Validate configuration.
         
+        The result is cached against the validated fields, so calling this
+        again without changing them skips the checks.
+        
         Returns:
             True if configuration is valid, False otherwise
         """
+        key = (
+            self.video.width, self.video.height,
+            self.video.output_width, self.video.output_height,
+            self.window.width, self.window.height,
+            self.logging.level,
+        )
+        
+        if self._validation_cache is not None and self._validation_cache[0] == key:
+            return self._validation_cache[1]
+        
+        result = self._check_values()
+        self._validation_cache = (key, result)
+        return result
+    
+    def _check_values(self) -> bool:
+        """Run the validation checks, stopping at the first failure."""
         try:
             # Validate video configuration
             if self.video.width <= 0 or self.video.height <= 0:
@@ -195,9 +295,9 @@ class Config:
                 return False
             
             # Validate logging configuration
-            valid_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
-            if self.logging.level.upper() not in valid_levels:
-                print(f"Error: Invalid log level '{self.logging.level}'")
+            level = self.logging.level
+            if level.upper() not in _VALID_LOG_LEVELS:
+                print(f"Error: Invalid log level '{level}'")
                 return False
             
             return True
@@ -210,7 +310,7 @@ class Config:
         """Print current configuration."""
         print("Current Configuration:")
         print("====================")
-        print(f"Video: {asdict(self.video)}")
-        print(f"Window: {asdict(self.window)}")
-        print(f"Logging: {asdict(self.logging)}")
+        print(f"Video: {_shallow_dict(self.video)}")
+        print(f"Window: {_shallow_dict(self.window)}")
+        print(f"Logging: {_shallow_dict(self.logging)}")
         print(f"Available devices: {self.get_video_devices()}")
\ No newline at end of file
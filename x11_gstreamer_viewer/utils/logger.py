@@ -10,6 +10,12 @@ import logging
 import sys
 from typing import Optional
 
+from .config import LoggingConfig
+
+# Default format and a formatter built once for it
+_DEFAULT_FORMAT = LoggingConfig().format
+_DEFAULT_FORMATTER = logging.Formatter(_DEFAULT_FORMAT)
+
 
 def setup_logging(level: str = "INFO", 
                   format_str: Optional[str] = None,
@@ -26,7 +32,7 @@ def setup_logging(level: str = "INFO",
     """
     # Default format
     if format_str is None:
-        format_str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        format_str = _DEFAULT_FORMAT
     
     # Convert level string to logging constant
     numeric_level = getattr(logging, level.upper(), logging.INFO)
@@ -38,8 +44,11 @@ def setup_logging(level: str = "INFO",
     # Clear existing handlers
     root_logger.handlers.clear()
     
-    # Create formatter
-    formatter = logging.Formatter(format_str)
+    # Create formatter (shared by all handlers)
+    if format_str == _DEFAULT_FORMAT:
+        formatter = _DEFAULT_FORMATTER
+    else:
+        formatter = logging.Formatter(format_str)
     
     # Console handler
     if console: